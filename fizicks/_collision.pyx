@@ -0,0 +1,174 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Ahead-of-time compiled batch collision kernels.
+
+Mirrors `grid_pairs` and `resolve_elastic_batch` in `fizicks._kernels`,
+which use these instead of interpreted Python when Numba is not installed
+but the extension has been built. The buffers may be float32 or float64,
+like the universe's.
+"""
+
+from cython cimport floating
+from libc.math cimport sqrt
+
+import numpy as np
+
+
+cdef inline bint _overlap(
+    Py_ssize_t i,
+    Py_ssize_t j,
+    const floating[:, ::1] positions,
+    const floating[::1] radii,
+    const unsigned char[::1] active,
+) noexcept nogil:
+    cdef floating dx = positions[i, 0] - positions[j, 0]
+    cdef floating dy = positions[i, 1] - positions[j, 1]
+    cdef floating dz = positions[i, 2] - positions[j, 2]
+    cdef floating r = radii[i] + radii[j]
+    return (dx * dx + dy * dy + dz * dz < r * r) & (active[i] | active[j])
+
+
+cdef Py_ssize_t _grid_sweep(
+    const long long[::1] keys,
+    const int[::1] order,
+    const int[::1] cell_start,
+    const long long[::1] neighbors,
+    const floating[:, ::1] positions,
+    const floating[::1] radii,
+    const unsigned char[::1] active,
+    int[:, ::1] out,
+    bint fill,
+) noexcept nogil:
+    cdef Py_ssize_t n_cells = keys.shape[0]
+    cdef Py_ssize_t n_neighbors = neighbors.shape[0]
+    cdef Py_ssize_t count = 0
+    cdef Py_ssize_t c, s, a, b, n, start, end
+    cdef int i, j
+    cdef long long key
+    # One cursor per neighbor, advanced through the sorted keys
+    cdef Py_ssize_t cursors[32]
+
+    for s in range(n_neighbors):
+        cursors[s] = 0
+    for c in range(n_cells):
+        start = cell_start[c]
+        end = cell_start[c + 1]
+
+        # Pairs within the cell
+        for a in range(start, end):
+            i = order[a]
+            for b in range(a + 1, end):
+                j = order[b]
+                if _overlap(i, j, positions, radii, active):
+                    if fill:
+                        out[count, 0] = min(i, j)
+                        out[count, 1] = max(i, j)
+                    count += 1
+
+        # Pairs with the forward neighbors, so each pair of cells is seen once
+        for s in range(n_neighbors):
+            key = keys[c] + neighbors[s]
+            n = cursors[s]
+            while n < n_cells and keys[n] < key:
+                n += 1
+            cursors[s] = n
+            if n == n_cells or keys[n] != key:
+                continue
+            for a in range(start, end):
+                i = order[a]
+                for b in range(cell_start[n], cell_start[n + 1]):
+                    j = order[b]
+                    if _overlap(i, j, positions, radii, active):
+                        if fill:
+                            out[count, 0] = min(i, j)
+                            out[count, 1] = max(i, j)
+                        count += 1
+    return count
+
+
+def _grid_pairs(
+    const long long[::1] keys,
+    const int[::1] order,
+    const int[::1] cell_start,
+    const long long[::1] neighbors,
+    const floating[:, ::1] positions,
+    const floating[::1] radii,
+    const unsigned char[::1] active,
+):
+    cdef int[:, ::1] out = np.empty((0, 2), dtype=np.int32)
+    cdef Py_ssize_t count
+    with nogil:
+        count = _grid_sweep(
+            keys, order, cell_start, neighbors, positions, radii, active, out, False
+        )
+    result = np.empty((count, 2), dtype=np.int32)
+    out = result
+    with nogil:
+        _grid_sweep(
+            keys, order, cell_start, neighbors, positions, radii, active, out, True
+        )
+    return result
+
+
+def grid_pairs(keys, order, cell_start, neighbors, positions, radii, active):
+    """Returns the index pairs of overlapping objects in a `SpatialHash` grid."""
+    if neighbors.shape[0] > 32:
+        raise ValueError("grid_pairs supports at most 32 neighbor offsets")
+    return _grid_pairs(
+        keys, order, cell_start, neighbors, positions, radii, active.view(np.uint8)
+    )
+
+
+def resolve_elastic_batch(
+    const int[:, ::1] pairs,
+    const floating[:, ::1] pos,
+    const floating[:, ::1] vel,
+    const floating[::1] mass,
+    floating[:, ::1] out_dv,
+    floating[:, :, ::1] pair_dv,
+):
+    """Resolves the elastic collisions of many object pairs at once."""
+    cdef Py_ssize_t m = pairs.shape[0]
+    cdef Py_ssize_t k, c
+    cdef int i, j
+    cdef double dx, dy, dz, d2, inv_d, nx, ny, nz, v1n, v2n, m1, m2
+    cdef double inv_total_mass, dv1, dv2
+
+    with nogil:
+        for k in range(m):
+            i = pairs[k, 0]
+            j = pairs[k, 1]
+            dx = pos[j, 0] - pos[i, 0]
+            dy = pos[j, 1] - pos[i, 1]
+            dz = pos[j, 2] - pos[i, 2]
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 == 0.0:
+                for c in range(3):
+                    pair_dv[k, 0, c] = 0.0
+                    pair_dv[k, 1, c] = 0.0
+                continue
+
+            inv_d = 1.0 / sqrt(d2)
+            nx = dx * inv_d
+            ny = dy * inv_d
+            nz = dz * inv_d
+            v1n = nx * vel[i, 0] + ny * vel[i, 1] + nz * vel[i, 2]
+            v2n = nx * vel[j, 0] + ny * vel[j, 1] + nz * vel[j, 2]
+
+            m1 = mass[i]
+            m2 = mass[j]
+            inv_total_mass = 1.0 / (m1 + m2)
+            dv1 = ((m1 - m2) * v1n + 2.0 * m2 * v2n) * inv_total_mass - v1n
+            dv2 = ((m2 - m1) * v2n + 2.0 * m1 * v1n) * inv_total_mass - v2n
+
+            pair_dv[k, 0, 0] = dv1 * nx
+            pair_dv[k, 0, 1] = dv1 * ny
+            pair_dv[k, 0, 2] = dv1 * nz
+            pair_dv[k, 1, 0] = dv2 * nx
+            pair_dv[k, 1, 1] = dv2 * ny
+            pair_dv[k, 1, 2] = dv2 * nz
+
+        for k in range(m):
+            for c in range(3):
+                out_dv[pairs[k, 0], c] += pair_dv[k, 0, c]
+                out_dv[pairs[k, 1], c] += pair_dv[k, 1, c]
@@ -0,0 +1,225 @@
+"""
+CUDA kernels for very large universes.
+
+These need Numba with a CUDA-capable GPU. `cuda` is None when Numba is not
+installed, and `available()` is False when there is no usable GPU; callers
+fall back to the CPU code paths in either case.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import cuda, float64
+except ImportError:  # pragma: no cover - depends on the environment
+    cuda = None
+
+#: Threads per block for the one-thread-per-object kernels
+THREADS_PER_BLOCK = 128
+
+# Large primes from Teschner et al. for hashing integer cell coordinates
+_P1, _P2, _P3 = 73856093, 19349663, 83492791
+
+
+def available() -> bool:
+    """Returns whether the CUDA kernels can run on this machine."""
+    return cuda is not None and cuda.is_available()
+
+
+if cuda is not None:
+
+    @cuda.jit(device=True)
+    def hash3(cx, cy, cz, table_size):
+        """Hashes integer cell coordinates into a table slot."""
+        return ((cx * _P1) ^ (cy * _P2) ^ (cz * _P3)) % table_size
+
+    @cuda.jit
+    def build_hash(positions, cell_size, head, nxt):
+        """
+        Pushes every object onto the linked list of its hash table slot.
+
+        One thread per object swaps itself in as the new list head, so the
+        lists are built without locks.
+        """
+        i = cuda.grid(1)
+        if i >= positions.shape[0]:
+            return
+        cx = int(math.floor(positions[i, 0] / cell_size))
+        cy = int(math.floor(positions[i, 1] / cell_size))
+        cz = int(math.floor(positions[i, 2] / cell_size))
+        h = hash3(cx, cy, cz, head.shape[0])
+        nxt[i] = cuda.atomic.exch(head, h, i)
+
+    @cuda.jit
+    def emit_pairs(head, nxt, positions, radii, cell_size, out_pairs, counter):
+        """
+        Emits every overlapping object pair (i, j), i < j, into `out_pairs`.
+
+        Each thread walks the 27 cells around its object. Objects whose cell
+        merely hashes into the same slot are skipped by comparing cells, which
+        also keeps a pair from being emitted twice. `counter[0]` ends up as the
+        number of pairs found, even if `out_pairs` was too small to hold them.
+        """
+        i = cuda.grid(1)
+        if i >= positions.shape[0]:
+            return
+        px = positions[i, 0]
+        py = positions[i, 1]
+        pz = positions[i, 2]
+        cx = int(math.floor(px / cell_size))
+        cy = int(math.floor(py / cell_size))
+        cz = int(math.floor(pz / cell_size))
+
+        for dx in range(-1, 2):
+            for dy in range(-1, 2):
+                for dz in range(-1, 2):
+                    j = head[hash3(cx + dx, cy + dy, cz + dz, head.shape[0])]
+                    while j != -1:
+                        if (
+                            j > i
+                            and int(math.floor(positions[j, 0] / cell_size)) == cx + dx
+                            and int(math.floor(positions[j, 1] / cell_size)) == cy + dy
+                            and int(math.floor(positions[j, 2] / cell_size)) == cz + dz
+                        ):
+                            ex = positions[j, 0] - px
+                            ey = positions[j, 1] - py
+                            ez = positions[j, 2] - pz
+                            r = radii[i] + radii[j]
+                            if ex * ex + ey * ey + ez * ez < r * r:
+                                k = cuda.atomic.add(counter, 0, 1)
+                                if k < out_pairs.shape[0]:
+                                    out_pairs[k, 0] = i
+                                    out_pairs[k, 1] = j
+                        j = nxt[j]
+
+    @cuda.jit
+    def collide(positions, velocities, masses, radii, dv):
+        """
+        Sums the elastic collision velocity change of every object into `dv`.
+
+        Every object is tested against every other one. Threads walk the
+        objects in tiles of one block: each thread loads one object of the
+        tile into shared memory, and the whole block then reuses the tile,
+        so each object is read from global memory once per block instead of
+        once per thread. As in `resolve_elastic_batch`, every collision is
+        resolved against the velocities from before the step.
+        """
+        tile_pos = cuda.shared.array((THREADS_PER_BLOCK, 3), float64)
+        tile_vel = cuda.shared.array((THREADS_PER_BLOCK, 3), float64)
+        tile_mass = cuda.shared.array(THREADS_PER_BLOCK, float64)
+        tile_radius = cuda.shared.array(THREADS_PER_BLOCK, float64)
+
+        n = positions.shape[0]
+        i = cuda.grid(1)
+        t = cuda.threadIdx.x
+        px = py = pz = vx = vy = vz = m1 = r1 = 0.0
+        if i < n:
+            px = positions[i, 0]
+            py = positions[i, 1]
+            pz = positions[i, 2]
+            vx = velocities[i, 0]
+            vy = velocities[i, 1]
+            vz = velocities[i, 2]
+            m1 = masses[i]
+            r1 = radii[i]
+        ax = ay = az = 0.0
+
+        for start in range(0, n, THREADS_PER_BLOCK):
+            j = start + t
+            if j < n:
+                for k in range(3):
+                    tile_pos[t, k] = positions[j, k]
+                    tile_vel[t, k] = velocities[j, k]
+                tile_mass[t] = masses[j]
+                tile_radius[t] = radii[j]
+            cuda.syncthreads()
+
+            if i < n:
+                for u in range(min(THREADS_PER_BLOCK, n - start)):
+                    if start + u == i:
+                        continue
+                    dx = tile_pos[u, 0] - px
+                    dy = tile_pos[u, 1] - py
+                    dz = tile_pos[u, 2] - pz
+                    d2 = dx * dx + dy * dy + dz * dz
+                    r = r1 + tile_radius[u]
+                    if d2 >= r * r or d2 == 0.0:
+                        continue
+
+                    inv_d = 1.0 / math.sqrt(d2)
+                    nx = dx * inv_d
+                    ny = dy * inv_d
+                    nz = dz * inv_d
+                    v1n = nx * vx + ny * vy + nz * vz
+                    v2n = (
+                        nx * tile_vel[u, 0] + ny * tile_vel[u, 1] + nz * tile_vel[u, 2]
+                    )
+                    m2 = tile_mass[u]
+                    change = ((m1 - m2) * v1n + 2.0 * m2 * v2n) / (m1 + m2) - v1n
+                    ax += change * nx
+                    ay += change * ny
+                    az += change * nz
+            cuda.syncthreads()
+
+        if i < n:
+            dv[i, 0] = ax
+            dv[i, 1] = ay
+            dv[i, 2] = az
+
+    @cuda.jit(device=True)
+    def resolve_border(p, v, radius, d, toroidal, restitution):
+        """Bounces or wraps one coordinate at the borders of a bounded axis."""
+        if toroidal:
+            if p < 0.0 or p >= d:
+                p -= d * math.floor(p / d)
+        elif p - radius < 0.0 or p + radius > d:
+            v = -v * restitution
+            p = max(radius, min(p, d - radius))
+        return p, v
+
+    @cuda.jit
+    def integrate(
+        positions,
+        velocities,
+        debt,
+        masses,
+        radii,
+        dv,
+        dims,
+        toroidal,
+        restitution,
+    ):
+        """
+        Applies the collision changes in `dv`, then advances every object by
+        one step like `fizicks._kernels.specialize_integrate`.
+        """
+        i = cuda.grid(1)
+        if i >= positions.shape[0]:
+            return
+        m = masses[i]
+        r = radii[i]
+        for k in range(3):
+            v = velocities[i, k] + dv[i, k]
+            owed = debt[i, k] + dv[i, k] * m
+            p = positions[i, k]
+            d = dims[k]
+            if d != 0.0:
+                p, v = resolve_border(p, v, r, d, toroidal, restitution)
+            v += owed
+            p += v
+            if d != 0.0:
+                p, v = resolve_border(p, v, r, d, toroidal, restitution)
+            positions[i, k] = p
+            velocities[i, k] = v
+            debt[i, k] = 0.0
+
+
+def blocks_for(n: int) -> int:
+    """Returns the number of blocks needed to cover `n` threads."""
+    return max(1, (n + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK)
+
+
+def table_size_for(n: int) -> int:
+    """Returns a power-of-two hash table size of at least twice `n`."""
+    return 1 << max(1, int(2 * n - 1).bit_length())
@@ -0,0 +1,859 @@
+"""
+Compiled numeric kernels for the collision hot paths.
+
+The kernels work on plain floats and arrays so Numba can compile them to
+machine code. Numba is optional: without it the kernels run as ordinary
+Python functions with the same results.
+
+Kernels generated for one configuration, see `specialize_integrate` and
+`specialize_grid_pairs`, are written as modules to `$XDG_CACHE_HOME/fizicks`,
+or `~/.cache/fizicks` if that is unset, so that Numba can cache them on
+disk. The directory can be deleted at any time.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def get_num_threads():
+        return 1
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(fastmath=True, cache=True)
+def resolve_elastic(p1x, p1y, p2x, p2y, v1x, v1y, v2x, v2y, m1, m2):
+    """
+    Resolves a 2D elastic collision between two circles.
+
+    Returns
+    -------
+    tuple[float, float, float, float]
+        The new velocities (v1x, v1y, v2x, v2y).
+    """
+    dx = p2x - p1x
+    dy = p2y - p1y
+    d2 = dx * dx + dy * dy
+    if d2 == 0.0:
+        # Coincident centers have no collision normal
+        return v1x, v1y, v2x, v2y
+
+    inv_d = 1.0 / math.sqrt(d2)
+    nx = dx * inv_d
+    ny = dy * inv_d
+
+    # Decompose velocities into normal and tangential components
+    v1n = nx * v1x + ny * v1y
+    v1t = -ny * v1x + nx * v1y
+    v2n = nx * v2x + ny * v2y
+    v2t = -ny * v2x + nx * v2y
+
+    # Update normal components using 1D elastic collision formulas
+    inv_total_mass = 1.0 / (m1 + m2)
+    v1n_after = ((m1 - m2) * v1n + 2.0 * m2 * v2n) * inv_total_mass
+    v2n_after = ((m2 - m1) * v2n + 2.0 * m1 * v1n) * inv_total_mass
+
+    return (
+        nx * v1n_after - ny * v1t,
+        ny * v1n_after + nx * v1t,
+        nx * v2n_after - ny * v2t,
+        ny * v2n_after + nx * v2t,
+    )
+
+
+@njit(fastmath=True, cache=True)
+def resolve_elastic_3d(
+    p1x, p1y, p1z, p2x, p2y, p2z, v1x, v1y, v1z, v2x, v2y, v2z, m1, m2
+):
+    """
+    Resolves a 3D elastic collision between two spheres.
+
+    Only the velocity components along the collision normal change; the
+    tangential part (everything orthogonal to the normal) is kept as is.
+
+    Returns
+    -------
+    tuple[float, float, float, float, float, float]
+        The new velocities (v1x, v1y, v1z, v2x, v2y, v2z).
+    """
+    dx = p2x - p1x
+    dy = p2y - p1y
+    dz = p2z - p1z
+    d2 = dx * dx + dy * dy + dz * dz
+    if d2 == 0.0:
+        # Coincident centers have no collision normal
+        return v1x, v1y, v1z, v2x, v2y, v2z
+
+    inv_d = 1.0 / math.sqrt(d2)
+    nx = dx * inv_d
+    ny = dy * inv_d
+    nz = dz * inv_d
+
+    v1n = nx * v1x + ny * v1y + nz * v1z
+    v2n = nx * v2x + ny * v2y + nz * v2z
+
+    inv_total_mass = 1.0 / (m1 + m2)
+    v1n_after = ((m1 - m2) * v1n + 2.0 * m2 * v2n) * inv_total_mass
+    v2n_after = ((m2 - m1) * v2n + 2.0 * m1 * v1n) * inv_total_mass
+
+    dv1 = v1n_after - v1n
+    dv2 = v2n_after - v2n
+    return (
+        v1x + dv1 * nx,
+        v1y + dv1 * ny,
+        v1z + dv1 * nz,
+        v2x + dv2 * nx,
+        v2y + dv2 * ny,
+        v2z + dv2 * nz,
+    )
+
+
+try:
+    # Prefer the ahead-of-time compiled versions, which need no JIT warmup
+    from fizicks._physics import resolve_elastic, resolve_elastic_3d  # noqa: F811
+except ImportError:
+    pass
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _elastic_dv(i, j, pos, vel, mass):
+    """Returns the velocity changes of objects i and j colliding elastically."""
+    dx = pos[j, 0] - pos[i, 0]
+    dy = pos[j, 1] - pos[i, 1]
+    dz = pos[j, 2] - pos[i, 2]
+    d2 = dx * dx + dy * dy + dz * dz
+    if d2 == 0.0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+
+    inv_d = 1.0 / math.sqrt(d2)
+    nx = dx * inv_d
+    ny = dy * inv_d
+    nz = dz * inv_d
+    v1n = nx * vel[i, 0] + ny * vel[i, 1] + nz * vel[i, 2]
+    v2n = nx * vel[j, 0] + ny * vel[j, 1] + nz * vel[j, 2]
+
+    m1 = mass[i]
+    m2 = mass[j]
+    inv_total_mass = 1.0 / (m1 + m2)
+    dv1 = ((m1 - m2) * v1n + 2.0 * m2 * v2n) * inv_total_mass - v1n
+    dv2 = ((m2 - m1) * v2n + 2.0 * m1 * v1n) * inv_total_mass - v2n
+    return dv1 * nx, dv1 * ny, dv1 * nz, dv2 * nx, dv2 * ny, dv2 * nz
+
+
+@njit(parallel=True, fastmath=True, cache=True, nogil=True)
+def resolve_elastic_batch(pairs, pos, vel, mass, out_dv, pair_dv):
+    """
+    Resolves the elastic collisions of many object pairs at once.
+
+    Every pair is resolved against the velocities from before the batch, so
+    the pairs are independent and run in parallel. Each pair writes its
+    velocity changes into its own slot of `pair_dv`, which is summed into
+    `out_dv` afterwards to avoid racing on objects in several pairs.
+
+    Parameters
+    ----------
+    pairs : np.ndarray
+        An (M, 2) integer array of colliding object indices.
+    pos : np.ndarray
+        An (N, 3) array of object positions.
+    vel : np.ndarray
+        An (N, 3) array of object velocities.
+    mass : np.ndarray
+        An (N,) array of object masses.
+    out_dv : np.ndarray
+        An (N, 3) array the velocity changes are added to.
+    pair_dv : np.ndarray
+        An (M, 2, 3) scratch buffer for the per-pair velocity changes. Its
+        contents are overwritten.
+    """
+    m = pairs.shape[0]
+    dv = pair_dv
+    for k in prange(m):
+        (
+            dv[k, 0, 0],
+            dv[k, 0, 1],
+            dv[k, 0, 2],
+            dv[k, 1, 0],
+            dv[k, 1, 1],
+            dv[k, 1, 2],
+        ) = _elastic_dv(pairs[k, 0], pairs[k, 1], pos, vel, mass)
+
+    for k in range(m):
+        for c in range(3):
+            out_dv[pairs[k, 0], c] += dv[k, 0, c]
+            out_dv[pairs[k, 1], c] += dv[k, 1, c]
+
+
+@njit(parallel=True, fastmath=True, cache=True, nogil=True)
+def resolve_elastic_colored(pairs, group_start, color_start, pos, vel, mass, out_dv):
+    """
+    Like `resolve_elastic_batch`, but adds into `out_dv` from every thread.
+
+    The pairs are grouped by the grid cell they start in, and the cells are
+    colored so that two groups of the same color never share an object.
+    The colors are resolved one after another, each in parallel over its
+    groups, so the velocity changes are added without racing or a
+    per-pair scratch buffer.
+
+    Parameters
+    ----------
+    pairs : np.ndarray
+        An (M, 2) integer array of colliding object indices, sorted by
+        color, then group.
+    group_start : np.ndarray
+        The pairs of group g are `pairs[group_start[g]:group_start[g + 1]]`.
+    color_start : np.ndarray
+        The groups of color c are `color_start[c]` to `color_start[c + 1]`.
+    pos : np.ndarray
+        An (N, 3) array of object positions.
+    vel : np.ndarray
+        An (N, 3) array of object velocities.
+    mass : np.ndarray
+        An (N,) array of object masses.
+    out_dv : np.ndarray
+        An (N, 3) array the velocity changes are added to.
+    """
+    for c in range(color_start.shape[0] - 1):
+        for g in prange(color_start[c], color_start[c + 1]):
+            for k in range(group_start[g], group_start[g + 1]):
+                i = pairs[k, 0]
+                j = pairs[k, 1]
+                dv1x, dv1y, dv1z, dv2x, dv2y, dv2z = _elastic_dv(i, j, pos, vel, mass)
+                out_dv[i, 0] += dv1x
+                out_dv[i, 1] += dv1y
+                out_dv[i, 2] += dv1z
+                out_dv[j, 0] += dv2x
+                out_dv[j, 1] += dv2y
+                out_dv[j, 2] += dv2z
+
+
+def resolve_borders_numpy(
+    positions, velocities, radii, dims, toroidal, restitution=1.0
+):
+    """
+    Bounces or wraps every object at the borders with NumPy, in place.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        An (N, 3) array of object positions.
+    velocities : np.ndarray
+        An (N, 3) array of object velocities.
+    radii : np.ndarray
+        An (N, 1) array of object radii.
+    dims : np.ndarray
+        The dimensions of the universe. Zero dimensions are unbounded.
+    toroidal : bool
+        Whether objects wrap around the borders instead of bouncing.
+    restitution : float
+        The fraction of their speed objects keep when bouncing off a border.
+    """
+    bounded = dims != 0
+    if toroidal:
+        # The modulo leaves positions inside the universe unchanged
+        np.mod(positions, dims, out=positions, where=bounded)
+        return
+
+    out = ((positions - radii < 0) | (positions + radii > dims)) & bounded
+    np.multiply(velocities, -restitution, out=velocities, where=out)
+    np.copyto(
+        positions, np.maximum(radii, np.minimum(positions, dims - radii)), where=out
+    )
+
+
+def integrate_numpy(
+    positions,
+    velocities,
+    debt,
+    radii,
+    active,
+    dims,
+    toroidal,
+    restitution=1.0,
+    block=4096,
+):
+    """
+    NumPy version of the `specialize_integrate` kernels, used when Numba is
+    not available.
+
+    The objects are processed in blocks small enough to stay in cache, so
+    the laws of motion read each block from memory once instead of making
+    a full pass over the buffers per law. All updates are done in place
+    with `out=` to avoid temporaries the size of the universe. Blocks
+    without an active object are skipped.
+    """
+    for start in range(0, positions.shape[0], block):
+        rows = slice(start, start + block)
+        if not active[rows].any():
+            continue
+
+        p = positions[rows]
+        v = velocities[rows]
+        r = radii[rows, None]
+        resolve_borders_numpy(p, v, r, dims, toroidal, restitution)
+
+        np.add(v, debt[rows], out=v)
+        np.add(p, v, out=p)
+        resolve_borders_numpy(p, v, r, dims, toroidal, restitution)
+
+        np.any(v != 0, axis=1, out=active[rows])
+
+
+# Generated kernel modules kept in the cache directory at most, see
+# `_load_source`
+CACHE_SIZE = 64
+
+
+def _cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "fizicks")
+
+
+@functools.lru_cache(maxsize=1)
+def _source_digest():
+    # Generated kernels inline the helpers defined here, so their cached
+    # machine code is only valid for this version of the module
+    with open(__file__, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def _prune_cache(directory):
+    """Removes the oldest generated modules beyond `CACHE_SIZE`."""
+    modules = sorted(
+        (entry.stat().st_mtime, entry.name[:-3])
+        for entry in os.scandir(directory)
+        if entry.name.startswith("_fizicks_") and entry.name.endswith(".py")
+    )
+    pycache = os.path.join(directory, "__pycache__")
+    for _, name in modules[: max(0, len(modules) - CACHE_SIZE)]:
+        os.remove(os.path.join(directory, name + ".py"))
+        if os.path.isdir(pycache):
+            # Numba's index and machine code files for the module
+            for entry in os.scandir(pycache):
+                if entry.name.startswith(name + "."):
+                    os.remove(entry.path)
+
+
+def _write_module(directory, path, source):
+    """Writes a generated module, moving it in place once complete."""
+    fd, partial = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(source)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+def _load_source(source):
+    """
+    Runs generated kernel source and returns its namespace.
+
+    Numba can only cache the machine code of functions defined in a file,
+    so the source is written to a module named after a hash of it, in
+    `$XDG_CACHE_HOME/fizicks` or else `~/.cache/fizicks`, and imported from
+    there. That way a kernel is compiled once rather than by every process.
+    A module is only reused if it holds exactly the source, and it is
+    written aside and moved in place, so other processes never see a
+    partial file. Only the `CACHE_SIZE` newest modules are kept. If the
+    module cannot be written or imported, the source is run in memory
+    instead.
+
+    Returns
+    -------
+    tuple[dict, bool]
+        The namespace, and whether its functions can be cached on disk.
+    """
+    digest = hashlib.sha1((_source_digest() + source).encode()).hexdigest()
+    name = f"_fizicks_{digest[:16]}"
+    if NUMBA_AVAILABLE:
+        try:
+            directory = _cache_dir()
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, name + ".py")
+            try:
+                with open(path) as file:
+                    current = file.read()
+            except (OSError, UnicodeDecodeError):
+                current = None
+            if current != source:
+                _write_module(directory, path, source)
+                _prune_cache(directory)
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            # Numba looks the module up by name when loading cached kernels
+            sys.modules[name] = module
+            spec.loader.exec_module(module)
+            return vars(module), True
+        except (OSError, ImportError, SyntaxError):
+            sys.modules.pop(name, None)
+
+    namespace = {}
+    exec(compile(source, f"<{name}>", "exec"), namespace)
+    return namespace, False
+
+
+# Source of the integration kernel with the borders left as a placeholder,
+# so they can be filled in with the dimensions of one universe as literals
+_INTEGRATE_SOURCE = """
+from fizicks._kernels import prange
+
+
+def integrate(positions, velocities, debt, radii, active, restitution):
+    for i in prange(positions.shape[0]):
+        if not active[i]:
+            continue
+
+        r = radii[i]
+{borders}
+        for k in range(3):
+            velocities[i, k] += debt[i, k]
+        for k in range(3):
+            positions[i, k] += velocities[i, k]
+{borders}
+        active[i] = (
+            velocities[i, 0] != 0.0
+            or velocities[i, 1] != 0.0
+            or velocities[i, 2] != 0.0
+        )
+"""
+
+_WRAP_SOURCE = """
+        p = positions[i, {k}]
+        if p < 0.0 or p >= {d!r}:
+            positions[i, {k}] = p % {d!r}
+"""
+
+_BOUNCE_SOURCE = """
+        p = positions[i, {k}]
+        if p - r < 0.0 or p + r > {d!r}:
+            velocities[i, {k}] = -velocities[i, {k}] * restitution
+            positions[i, {k}] = max(r, min(p, {d!r} - r))
+"""
+
+
+@functools.lru_cache(maxsize=8)
+def specialize_integrate(dims, toroidal):
+    """
+    Returns a kernel advancing every object by one time step.
+
+    The kernel fuses the laws of motion. Each object is handled
+    independently, so the objects run in parallel and every row is read and
+    written once per step. Objects at rest are skipped, since a step would
+    not change them.
+
+    The dimensions and the border behaviour are written into the generated
+    source as constants, so the kernel has no border branches to take per
+    object and only tests the bounded axes. That lets Numba vectorize the
+    loop. The kernels of the most recent configurations are kept, and each
+    one is compiled the first time it is used, or loaded from Numba's disk
+    cache, see `_load_source`.
+
+    Parameters
+    ----------
+    dims : tuple[float, float, float]
+        The dimensions of the universe. Zero dimensions are unbounded.
+    toroidal : bool
+        Whether objects wrap around the borders instead of bouncing.
+
+    Returns
+    -------
+    Callable
+        A function taking the (N, 3) positions, velocities and debt, the
+        (N,) radii and active arrays and the restitution, the fraction of
+        their speed objects keep when bouncing off a border. The arrays are
+        updated in place, `active` to the objects still moving afterwards.
+    """
+    if not NUMBA_AVAILABLE:  # pragma: no cover - depends on the environment
+        # Generated Python loops would be far slower than NumPy
+        bounds = np.array(dims)
+
+        def integrate(positions, velocities, debt, radii, active, restitution):
+            integrate_numpy(
+                positions,
+                velocities,
+                debt,
+                radii,
+                active,
+                bounds,
+                toroidal,
+                restitution,
+            )
+
+        return integrate
+
+    border = _WRAP_SOURCE if toroidal else _BOUNCE_SOURCE
+    borders = "".join(
+        border.format(k=k, d=float(d)) for k, d in enumerate(dims) if d != 0
+    )
+    namespace, cached = _load_source(_INTEGRATE_SOURCE.format(borders=borders))
+    return njit(parallel=True, fastmath=True, cache=cached, nogil=True)(
+        namespace["integrate"]
+    )
+
+
+@njit(cache=True)
+def insertion_sort(order, keys):
+    """
+    Sorts `order` in place so that `keys[order]` is ascending.
+
+    Insertion sort is linear on nearly sorted input, which is what an order
+    from the previous time step is when objects move coherently.
+    """
+    for k in range(1, order.shape[0]):
+        item = order[k]
+        key = keys[item]
+        m = k - 1
+        while m >= 0 and keys[order[m]] > key:
+            order[m + 1] = order[m]
+            m -= 1
+        order[m + 1] = item
+
+
+@njit(cache=True)
+def _sweep(order, lower, upper, out):
+    count = 0
+    n = order.shape[0]
+    for a in range(n):
+        i = order[a]
+        for b in range(a + 1, n):
+            j = order[b]
+            # Every later interval starts past this one, so stop the sweep
+            if lower[j, 0] > upper[i, 0]:
+                break
+            if (
+                lower[j, 1] > upper[i, 1]
+                or lower[i, 1] > upper[j, 1]
+                or lower[j, 2] > upper[i, 2]
+                or lower[i, 2] > upper[j, 2]
+            ):
+                continue
+            if out.shape[0] > 0:
+                out[count, 0] = min(i, j)
+                out[count, 1] = max(i, j)
+            count += 1
+    return count
+
+
+@njit(cache=True)
+def sweep_and_prune(order, lower, upper):
+    """
+    Returns the index pairs of objects whose bounding boxes overlap.
+
+    Parameters
+    ----------
+    order : np.ndarray
+        The object indices sorted by the lower x bound.
+    lower : np.ndarray
+        An (N, 3) array of bounding box minimums.
+    upper : np.ndarray
+        An (N, 3) array of bounding box maximums.
+
+    Returns
+    -------
+    np.ndarray
+        An (M, 2) int32 array of object indices with i < j for every row.
+    """
+    count = _sweep(order, lower, upper, np.empty((0, 2), dtype=np.int32))
+    out = np.empty((count, 2), dtype=np.int32)
+    _sweep(order, lower, upper, out)
+    return out
+
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _overlap(i, j, positions, radii, active):
+    # Both tests are always evaluated, leaving no branch to mispredict
+    dx = positions[i, 0] - positions[j, 0]
+    dy = positions[i, 1] - positions[j, 1]
+    dz = positions[i, 2] - positions[j, 2]
+    r = radii[i] + radii[j]
+    return (dx * dx + dy * dy + dz * dz < r * r) & (active[i] | active[j])
+
+
+# Number of cell ranges the grid is split into for `grid_pairs`, enough to
+# balance the load across any realistic number of threads
+GRID_CHUNKS = 256
+
+
+@njit(cache=True, nogil=True)
+def _pack_shares(out, counts, chunks, share):
+    """Packs the pairs of each range's share of `out` to the front of it."""
+    total = 0
+    largest = 0
+    for k in range(chunks):
+        largest = max(largest, counts[k])
+    if largest > share:
+        return 0, largest
+    for k in range(chunks):
+        # Shares only move forward, so copying in order never clobbers
+        for m in range(counts[k]):
+            out[total + m, 0] = out[k * share + m, 0]
+            out[total + m, 1] = out[k * share + m, 1]
+        total += counts[k]
+    return total, largest
+
+
+_GRID_SOURCE = """
+import numpy as np
+
+from fizicks._kernels import GRID_CHUNKS, _overlap, _pack_shares, prange
+
+
+def sweep(keys, order, cell_start, positions, radii, active, first, last, out):
+    count = 0
+    n_cells = keys.shape[0]
+{cursors}
+    for c in range(first, last):
+        start = cell_start[c]
+        end = cell_start[c + 1]
+        for a in range(start, end):
+            i = order[a]
+            for b in range(a + 1, end):
+                j = order[b]
+                if _overlap(i, j, positions, radii, active):
+                    if count < out.shape[0]:
+                        out[count, 0] = min(i, j)
+                        out[count, 1] = max(i, j)
+                    count += 1
+{neighbors}
+    return count
+
+
+def grid_pairs(keys, order, cell_start, positions, radii, active, out, counts):
+    n_cells = keys.shape[0]
+    chunks = min(GRID_CHUNKS, n_cells)
+    bounds = np.linspace(0, n_cells, chunks + 1).astype(np.int64)
+    share = out.shape[0] // GRID_CHUNKS
+    for k in prange(chunks):
+        counts[k] = sweep(
+            keys,
+            order,
+            cell_start,
+            positions,
+            radii,
+            active,
+            bounds[k],
+            bounds[k + 1],
+            out[k * share : (k + 1) * share],
+        )
+    return _pack_shares(out, counts, chunks, share)
+"""
+
+_CURSOR_SOURCE = """
+    n{s} = np.searchsorted(keys, keys[first] + {offset!r})
+"""
+
+_NEIGHBOR_SOURCE = """
+        key = keys[c] + {offset!r}
+        while n{s} < n_cells and keys[n{s}] < key:
+            n{s} += 1
+        if n{s} < n_cells and keys[n{s}] == key:
+            for a in range(start, end):
+                i = order[a]
+                for b in range(cell_start[n{s}], cell_start[n{s} + 1]):
+                    j = order[b]
+                    if _overlap(i, j, positions, radii, active):
+                        if count < out.shape[0]:
+                            out[count, 0] = min(i, j)
+                            out[count, 1] = max(i, j)
+                        count += 1
+"""
+
+
+@functools.lru_cache(maxsize=8)
+def specialize_grid_pairs(neighbors):
+    """
+    Returns a kernel finding the overlapping objects in a `SpatialHash` grid.
+
+    The kernel runs the broad and narrow phase in one compiled pass: every
+    occupied cell is checked against itself and its forward neighbors,
+    which are found by walking the sorted cell keys. The cells are split
+    into ranges that run in parallel, and each range writes its pairs into
+    its own equal share of a reusable buffer in a single pass. The shares
+    are then packed to the front of the buffer.
+
+    The offsets are written into the generated source as constants, and
+    the loop over them is unrolled with a local cursor per offset, so the
+    cell walk does no indexing into the offsets or the cursors. The kernels
+    of the most recent sets of offsets are kept, and each one is compiled
+    the first time it is used, or loaded from Numba's disk cache, see
+    `_load_source`.
+
+    Parameters
+    ----------
+    neighbors : tuple[int, ...]
+        The key offsets of the neighboring cells to visit.
+
+    Returns
+    -------
+    Callable
+        A function taking the keys, order, cell_start, positions, radii and
+        active arguments of `grid_pairs`, a (K, 2) int32 buffer the pairs
+        are written to and a (GRID_CHUNKS,) int64 buffer for the pair count
+        of each range. It returns the number of pairs and the largest number
+        found by one range. The pairs are valid in the front of the buffer
+        if the largest count fits in its share, `K // GRID_CHUNKS`;
+        otherwise nothing usable is written, see `find_grid_pairs`.
+    """
+    source = _GRID_SOURCE.format(
+        cursors="".join(
+            _CURSOR_SOURCE.format(s=s, offset=int(offset))
+            for s, offset in enumerate(neighbors)
+        ),
+        neighbors="".join(
+            _NEIGHBOR_SOURCE.format(s=s, offset=int(offset))
+            for s, offset in enumerate(neighbors)
+        ),
+    )
+    namespace, cached = _load_source(source)
+    namespace["sweep"] = njit(fastmath=True, cache=cached, nogil=True)(
+        namespace["sweep"]
+    )
+    return njit(parallel=True, cache=cached, nogil=True)(namespace["grid_pairs"])
+
+
+def find_grid_pairs(
+    keys, order, cell_start, neighbors, positions, radii, active, out, counts
+):
+    """
+    Finds the overlapping objects in a `SpatialHash` grid into a buffer.
+
+    Runs the `specialize_grid_pairs` kernel for `neighbors`, and grows the
+    buffer and runs it again whenever a range of cells overflows its share.
+
+    Parameters
+    ----------
+    neighbors : tuple[int, ...]
+        The key offsets of the neighboring cells to visit.
+    out : np.ndarray
+        A (K, 2) int32 buffer the pairs are written to, if large enough.
+    counts : np.ndarray
+        A (GRID_CHUNKS,) int64 buffer for the pair count of each range.
+
+    Returns
+    -------
+    tuple[int, np.ndarray]
+        The number of pairs, and the buffer holding them at its front,
+        which is `out` unless it had to grow.
+    """
+    kernel = specialize_grid_pairs(neighbors)
+    while True:
+        count, largest = kernel(
+            keys, order, cell_start, positions, radii, active, out, counts
+        )
+        share = out.shape[0] // GRID_CHUNKS
+        if largest <= share:
+            return count, out
+        share = max(2 * share, largest + largest // 2)
+        out = np.empty((GRID_CHUNKS * share, 2), dtype=np.int32)
+
+
+def grid_pairs(keys, order, cell_start, neighbors, positions, radii, active):
+    """
+    Returns the index pairs of overlapping objects in a `SpatialHash` grid.
+
+    Parameters
+    ----------
+    keys : np.ndarray
+        The sorted int64 keys of the occupied cells.
+    order : np.ndarray
+        The object indices sorted by cell.
+    cell_start : np.ndarray
+        The offsets of each cell's objects in `order`, plus the total count.
+    neighbors : np.ndarray
+        The key offsets of the neighboring cells to check.
+    positions : np.ndarray
+        An (N, 3) array of object positions.
+    radii : np.ndarray
+        An (N,) array of object radii.
+    active : np.ndarray
+        An (N,) bool array; pairs of two inactive objects are skipped.
+
+    Returns
+    -------
+    np.ndarray
+        An (M, 2) int32 array of object indices with i < j for every row.
+    """
+    count, out = find_grid_pairs(
+        keys,
+        order,
+        cell_start,
+        tuple(neighbors.tolist()),
+        positions,
+        radii,
+        active,
+        np.empty((GRID_CHUNKS * 64, 2), dtype=np.int32),
+        np.empty(GRID_CHUNKS, dtype=np.int64),
+    )
+    return out[:count].copy()
+
+
+#: Whether `grid_pairs` and `resolve_elastic_batch` run as compiled code
+COMPILED_BATCH = NUMBA_AVAILABLE
+
+if not NUMBA_AVAILABLE:  # pragma: no cover - depends on the environment
+    try:
+        # Without Numba, the Cython versions beat interpreted Python loops
+        from fizicks._collision import (  # noqa: F811
+            grid_pairs,
+            resolve_elastic_batch,
+        )
+
+        COMPILED_BATCH = True
+    except ImportError:
+        pass
+
+
+@njit(cache=True)
+def draw_circles(frame, centers, radii, colors):
+    """
+    Draws filled circles into an RGB frame buffer.
+
+    Parameters
+    ----------
+    frame : np.ndarray
+        A (W, H, 3) uint8 array, indexed like `pygame.surfarray`.
+    centers : np.ndarray
+        An (N, 2) array of circle centers in pixels.
+    radii : np.ndarray
+        An (N,) array of circle radii in pixels.
+    colors : np.ndarray
+        An (N, 3) uint8 array of circle colors.
+    """
+    width = frame.shape[0]
+    height = frame.shape[1]
+    for n in range(centers.shape[0]):
+        cx = centers[n, 0]
+        cy = centers[n, 1]
+        r = radii[n]
+        r2 = r * r
+        # Only the pixels of the bounding box that are on screen
+        for x in range(max(cx - r, 0), min(cx + r + 1, width)):
+            dx = x - cx
+            for y in range(max(cy - r, 0), min(cy + r + 1, height)):
+                dy = y - cy
+                if dx * dx + dy * dy <= r2:
+                    frame[x, y, 0] = colors[n, 0]
+                    frame[x, y, 1] = colors[n, 1]
+                    frame[x, y, 2] = colors[n, 2]
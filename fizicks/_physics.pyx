@@ -0,0 +1,120 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+Ahead-of-time compiled elastic collision math.
+
+Mirrors the scalar kernels in `fizicks._kernels`, which use these instead
+of the Numba versions when the extension has been built, so short-lived
+processes don't pay the JIT warmup.
+"""
+
+from libc.math cimport sqrt
+
+
+cdef inline (double, double, double, double) _resolve_elastic_2d(
+    double p1x, double p1y, double p2x, double p2y,
+    double v1x, double v1y, double v2x, double v2y,
+    double m1, double m2,
+) noexcept nogil:
+    cdef double dx = p2x - p1x
+    cdef double dy = p2y - p1y
+    cdef double d2 = dx * dx + dy * dy
+    if d2 == 0.0:
+        # Coincident centers have no collision normal
+        return v1x, v1y, v2x, v2y
+
+    cdef double inv_d = 1.0 / sqrt(d2)
+    cdef double nx = dx * inv_d
+    cdef double ny = dy * inv_d
+
+    # Decompose velocities into normal and tangential components
+    cdef double v1n = nx * v1x + ny * v1y
+    cdef double v1t = -ny * v1x + nx * v1y
+    cdef double v2n = nx * v2x + ny * v2y
+    cdef double v2t = -ny * v2x + nx * v2y
+
+    # Update normal components using 1D elastic collision formulas
+    cdef double inv_total_mass = 1.0 / (m1 + m2)
+    cdef double v1n_after = ((m1 - m2) * v1n + 2.0 * m2 * v2n) * inv_total_mass
+    cdef double v2n_after = ((m2 - m1) * v2n + 2.0 * m1 * v1n) * inv_total_mass
+
+    return (
+        nx * v1n_after - ny * v1t,
+        ny * v1n_after + nx * v1t,
+        nx * v2n_after - ny * v2t,
+        ny * v2n_after + nx * v2t,
+    )
+
+
+cdef inline (double, double, double, double, double, double) _resolve_elastic_3d(
+    double p1x, double p1y, double p1z, double p2x, double p2y, double p2z,
+    double v1x, double v1y, double v1z, double v2x, double v2y, double v2z,
+    double m1, double m2,
+) noexcept nogil:
+    cdef double dx = p2x - p1x
+    cdef double dy = p2y - p1y
+    cdef double dz = p2z - p1z
+    cdef double d2 = dx * dx + dy * dy + dz * dz
+    if d2 == 0.0:
+        # Coincident centers have no collision normal
+        return v1x, v1y, v1z, v2x, v2y, v2z
+
+    cdef double inv_d = 1.0 / sqrt(d2)
+    cdef double nx = dx * inv_d
+    cdef double ny = dy * inv_d
+    cdef double nz = dz * inv_d
+
+    cdef double v1n = nx * v1x + ny * v1y + nz * v1z
+    cdef double v2n = nx * v2x + ny * v2y + nz * v2z
+
+    cdef double inv_total_mass = 1.0 / (m1 + m2)
+    cdef double dv1 = ((m1 - m2) * v1n + 2.0 * m2 * v2n) * inv_total_mass - v1n
+    cdef double dv2 = ((m2 - m1) * v2n + 2.0 * m1 * v1n) * inv_total_mass - v2n
+
+    return (
+        v1x + dv1 * nx,
+        v1y + dv1 * ny,
+        v1z + dv1 * nz,
+        v2x + dv2 * nx,
+        v2y + dv2 * ny,
+        v2z + dv2 * nz,
+    )
+
+
+def resolve_elastic(
+    double p1x, double p1y, double p2x, double p2y,
+    double v1x, double v1y, double v2x, double v2y,
+    double m1, double m2,
+):
+    """
+    Resolves a 2D elastic collision between two circles.
+
+    Returns
+    -------
+    tuple[float, float, float, float]
+        The new velocities (v1x, v1y, v2x, v2y).
+    """
+    cdef (double, double, double, double) result
+    with nogil:
+        result = _resolve_elastic_2d(p1x, p1y, p2x, p2y, v1x, v1y, v2x, v2y, m1, m2)
+    return result
+
+
+def resolve_elastic_3d(
+    double p1x, double p1y, double p1z, double p2x, double p2y, double p2z,
+    double v1x, double v1y, double v1z, double v2x, double v2y, double v2z,
+    double m1, double m2,
+):
+    """
+    Resolves a 3D elastic collision between two spheres.
+
+    Returns
+    -------
+    tuple[float, float, float, float, float, float]
+        The new velocities (v1x, v1y, v1z, v2x, v2y, v2z).
+    """
+    cdef (double, double, double, double, double, double) result
+    with nogil:
+        result = _resolve_elastic_3d(
+            p1x, p1y, p1z, p2x, p2y, p2z, v1x, v1y, v1z, v2x, v2y, v2z, m1, m2
+        )
+    return result
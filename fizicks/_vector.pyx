@@ -0,0 +1,74 @@
+# cython: cdivision=True, language_level=3
+"""
+Ahead-of-time compiled `Vector3`.
+
+Mirrors the pure-Python class in `fizicks.vector3`, which re-exports this
+one when the extension has been built.
+"""
+
+cimport cython
+from libc.math cimport sqrt
+
+
+cdef inline Vector3 _new(double x, double y, double z):
+    # Skip __init__ and its argument parsing for results
+    cdef Vector3 v = Vector3.__new__(Vector3)
+    v.x = x
+    v.y = y
+    v.z = z
+    return v
+
+
+cdef class Vector3:
+    """
+    A vector in three-dimensional space stored as three C doubles.
+
+    Methods
+    -------
+    magnitude() -> float
+        Returns the magnitude of the vector.
+    dot(other: Vector3) -> float
+        Returns the dot product of two vectors.
+    """
+
+    cdef public double x, y, z
+
+    def __init__(self, double x=0.0, double y=0.0, double z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __add__(Vector3 self, Vector3 other):
+        return _new(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(Vector3 self, Vector3 other):
+        return _new(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(Vector3 self, double other):
+        return _new(self.x * other, self.y * other, self.z * other)
+
+    # Raises ZeroDivisionError like the pure-Python class
+    @cython.cdivision(False)
+    def __truediv__(Vector3 self, double other):
+        cdef double inv = 1.0 / other
+        return _new(self.x * inv, self.y * inv, self.z * inv)
+
+    def __eq__(self, other):
+        if not isinstance(other, Vector3):
+            return NotImplemented
+        cdef Vector3 o = <Vector3>other
+        return self.x == o.x and self.y == o.y and self.z == o.z
+
+    def __iter__(self):
+        return iter((self.x, self.y, self.z))
+
+    def __repr__(self):
+        return f"Vector3({self.x}, {self.y}, {self.z})"
+
+    cpdef double magnitude(self):
+        """Returns the magnitude of the vector."""
+        return sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    cpdef double dot(self, Vector3 other):
+        """Returns the dot product of two vectors."""
+        return self.x * other.x + self.y * other.y + self.z * other.z
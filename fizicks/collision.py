@@ -1,7 +1,18 @@
-from typing import TYPE_CHECKING, Union
+import threading
+from typing import TYPE_CHECKING, Iterable, Optional, Union
 
-from fizicks.data import Vector
-from fizicks.universe import Universe
+import numpy as np
+
+from fizicks._kernels import (
+    COMPILED_BATCH,
+    get_num_threads,
+    resolve_borders_numpy,
+    resolve_elastic_3d,
+    resolve_elastic_batch,
+    resolve_elastic_colored,
+)
+from fizicks.data import Force
+from fizicks.universe import DTYPE, Universe
 from fizicks.util import LogConfig, log_event
 
 if TYPE_CHECKING:
@@ -23,6 +34,93 @@ resolve_log_config = LogConfig(
 )
 
 
+class _Scratch(threading.local):
+    """
+    Buffers reused by the batched collision code across time steps.
+
+    Each thread gets its own buffers. They only grow, so steady-state steps
+    reuse the same memory instead of allocating new arrays. They are stored
+    as `DTYPE` like the universe's buffers, so applying them does not mix
+    precisions.
+    """
+
+    def __init__(self) -> None:
+        self.out_dv = np.zeros((0, 3), dtype=DTYPE)
+        self.pair_dv = np.zeros((0, 2, 3), dtype=DTYPE)
+
+    def take(self, n: int, m: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a zeroed (n, 3) velocity change buffer and an (m, 2, 3) pair
+        buffer, growing the underlying buffers if needed.
+        """
+        if self.out_dv.shape[0] < n:
+            self.out_dv = np.zeros((max(n, 2 * self.out_dv.shape[0]), 3), DTYPE)
+        if self.pair_dv.shape[0] < m:
+            self.pair_dv = np.zeros((max(m, 2 * self.pair_dv.shape[0]), 2, 3), DTYPE)
+
+        out_dv = self.out_dv[:n]
+        out_dv.fill(0)
+        return out_dv, self.pair_dv[:m]
+
+
+_scratch = _Scratch()
+
+
+def _sort_pairs(pairs: np.ndarray, dedup: bool = False) -> np.ndarray:
+    """
+    Sorts index pairs (i, j), i < j, by i, then j.
+
+    Each pair is packed into one int64 key, so this is a single sort. With
+    `dedup`, repeated pairs are dropped as well.
+    """
+    keys = pairs[:, 0].astype(np.int64) << 32
+    keys |= pairs[:, 1]
+    if dedup:
+        keys = np.unique(keys)
+        return np.stack((keys >> 32, keys & 0xFFFFFFFF), axis=1)
+    return pairs[np.argsort(keys)]
+
+
+def _color_pairs(
+    pairs: np.ndarray, positions: np.ndarray, radii: np.ndarray
+) -> Optional[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Groups index pairs by grid cell, and colors the groups for
+    `resolve_elastic_colored`.
+
+    With cells as wide as the largest diameter, the objects of a colliding
+    pair are at most one cell apart, so each pair is assigned the lowest
+    cell it spans on every axis. Its color is that cell's coordinates
+    modulo 3, so the cells of two groups of the same color are at least
+    three apart on some axis, and the groups share no objects.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray, np.ndarray] or None
+        The pairs sorted by color and cell, and the group and color
+        boundaries, or None if some pair spans more than two cells.
+    """
+    cell_size = 2 * float(radii.max())
+    if cell_size <= 0:
+        return None
+    inv_cell_size = 1.0 / cell_size
+    first = np.floor(positions[pairs[:, 0]] * inv_cell_size).astype(np.int64)
+    second = np.floor(positions[pairs[:, 1]] * inv_cell_size).astype(np.int64)
+    if np.abs(first - second).max() > 1:
+        return None
+
+    cells = np.minimum(first, second)
+    colors = (cells % 3) @ np.array([9, 3, 1])
+    order = np.lexsort((cells[:, 2], cells[:, 1], cells[:, 0], colors))
+    cells = cells[order]
+    colors = colors[order]
+    changed = np.any(cells[1:] != cells[:-1], axis=1)
+    group_start = np.flatnonzero(np.concatenate(([True], changed)))
+    color_start = np.searchsorted(colors[group_start], np.arange(28))
+    group_start = np.append(group_start, len(pairs))
+    return pairs[order], group_start, color_start
+
+
 class Collision:
     """
     Handles collision detection and resolution between objects.
@@ -41,6 +139,21 @@ class Collision:
     resolve(object: Matter, universe: Universe, other: Matter = None) -> None
         Resolves the collision between two objects using elastic
         collision formulas.
+    detect_pairs(universe: Universe, candidates=None) -> list[tuple[int, int]]
+        Detects every colliding pair of objects in the universe.
+    detect_pair_array(universe: Universe, candidates=None) -> np.ndarray
+        Like `detect_pairs`, but returns the pairs as an (M, 2) array.
+    resolve_batch(universe: Universe, pairs: list[tuple[int, int]]) -> None
+        Resolves the collisions of many object pairs in one kernel call.
+    detect_borders_batch(universe: Universe) -> np.ndarray
+        Detects every object that has collided with the border of the space.
+    resolve_borders_batch(universe: Universe) -> None
+        Resolves the border collisions of every object in the universe.
+
+    Callers that already know what they are checking against should use the
+    module-level `detect_pair`, `detect_border`, `resolve_pair` and
+    `resolve_border` functions, which skip the `isinstance` dispatch of
+    `detect` and `resolve`.
     """
 
     @staticmethod
@@ -87,6 +200,171 @@ class Collision:
         else:
             Collision._resolve_objects(object, other)
 
+    @staticmethod
+    def detect_pairs(
+        universe: "Universe",
+        candidates: Optional[Iterable[tuple[int, int]]] = None,
+        active_only: bool = False,
+    ) -> list[tuple[int, int]]:
+        """
+        Detects every colliding pair of objects in the universe.
+
+        A broad phase narrows the candidates down before the exact check is
+        run on all of them at once over the structure-of-arrays buffers. By
+        default this is the universe's spatial hash, and with Numba or the
+        Cython extension both phases run in one compiled pass over its grid.
+        `Universe.sync_arrays` must be called first.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe whose objects to check.
+        candidates : Iterable[tuple[int, int]], optional
+            Candidate index pairs from another broad phase, for example
+            `Broadphase.candidate_pairs`. They may come in either order and
+            repeat; each colliding pair is returned once.
+        active_only : bool
+            Whether to skip pairs of two objects at rest, which a collision
+            would not change. See `Universe.active`.
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            The sorted index pairs (i, j), i < j, of colliding objects.
+        """
+        pairs = Collision.detect_pair_array(universe, candidates, active_only)
+        return list(map(tuple, pairs.tolist()))
+
+    @staticmethod
+    def detect_pair_array(
+        universe: "Universe",
+        candidates: Optional[Iterable[tuple[int, int]]] = None,
+        active_only: bool = False,
+    ) -> np.ndarray:
+        """
+        Like `detect_pairs`, but returns the pairs as an (M, 2) array.
+
+        Skips building a tuple per pair, for callers that hand the pairs
+        straight on to `resolve_batch`.
+        """
+        if candidates is None and COMPILED_BATCH:
+            # Broad and narrow phase in one compiled pass over the grid
+            pairs = universe.spatial_hash.colliding_pairs(universe, active_only)
+            return _sort_pairs(pairs)
+
+        if candidates is None:
+            candidates = universe.spatial_hash.query_pairs(universe)
+        if not isinstance(candidates, np.ndarray):
+            candidates = list(candidates)
+        pairs = np.asarray(candidates, dtype=np.int64).reshape(-1, 2)
+        # Every pair is resolved once, however the candidates list it
+        pairs = np.sort(pairs, axis=1)
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        if active_only:
+            active = universe.active
+            pairs = pairs[active[pairs[:, 0]] | active[pairs[:, 1]]]
+
+        # Narrow phase over all candidates at once
+        pairs = pairs[universe._overlaps(pairs[:, 0], pairs[:, 1])]
+        return _sort_pairs(pairs, dedup=True)
+
+    @staticmethod
+    def resolve_batch(
+        universe: "Universe", pairs: Union[list[tuple[int, int]], np.ndarray]
+    ) -> None:
+        """
+        Resolves the collisions of many object pairs in one kernel call.
+
+        Unlike resolving the pairs one after another, every pair is resolved
+        against the velocities from before the batch. With several Numba
+        threads, the pairs are colored by grid cell so that the threads can
+        add up the velocity changes without racing. `Universe.sync_arrays`
+        must be called first.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe the colliding objects belong to.
+        pairs : list[tuple[int, int]]
+            The index pairs of colliding objects.
+        """
+        pairs = np.asarray(pairs, dtype=np.int32).reshape(-1, 2)
+        groups = None
+        if len(pairs) and get_num_threads() > 1:
+            groups = _color_pairs(pairs, universe.positions, universe.radii)
+
+        if groups is None:
+            out_dv, pair_dv = _scratch.take(len(universe.objects), len(pairs))
+            resolve_elastic_batch(
+                pairs,
+                universe.positions,
+                universe.velocities,
+                universe.masses,
+                out_dv,
+                pair_dv,
+            )
+        else:
+            out_dv, _ = _scratch.take(len(universe.objects), 0)
+            resolve_elastic_colored(
+                *groups,
+                universe.positions,
+                universe.velocities,
+                universe.masses,
+                out_dv,
+            )
+
+        universe.velocities += out_dv
+        # Scale the changes in place to get the momentum owed
+        out_dv *= universe.masses[:, None]
+        universe.debt += out_dv
+        universe.active[pairs.ravel()] = True
+
+    @staticmethod
+    def detect_borders_batch(universe: "Universe") -> np.ndarray:
+        """
+        Detects every object that has collided with the border of the space.
+
+        `Universe.sync_arrays` must be called first.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe whose objects to check.
+
+        Returns
+        -------
+        np.ndarray
+            The indices of the objects touching or crossing the border.
+        """
+        positions = universe.positions
+        radii = universe.radii[:, None]
+        dims = universe.dimensions_arr
+        mask = ((positions - radii < 0) | (positions + radii > dims)) & (dims != 0)
+        return np.nonzero(mask.any(axis=1))[0]
+
+    @staticmethod
+    def resolve_borders_batch(universe: "Universe") -> None:
+        """
+        Resolves the border collisions of every object in the universe.
+
+        Runs as a few masked NumPy operations over the structure-of-arrays
+        buffers, which the objects view directly. `Universe.sync_arrays`
+        must be called first.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe whose objects to resolve.
+        """
+        resolve_borders_numpy(
+            universe.positions,
+            universe.velocities,
+            universe.radii[:, None],
+            universe.dimensions_arr,
+            universe.toroidal,
+            universe.restitution,
+        )
+
     @staticmethod
     def _detect_objects(object1: "Matter", object2: "Matter") -> bool:
         """
@@ -104,8 +382,9 @@ class Collision:
         bool
             True if a collision has occurred, False otherwise.
         """
-        distance = (object1.position - object2.position).magnitude()
-        return distance < (object1.radius + object2.radius)
+        # Compare squared distances to skip the square root
+        radius_sum = object1.radius + object2.radius
+        return object1.position.sqdist(object2.position) < radius_sum * radius_sum
 
     @staticmethod
     def _resolve_objects(object1: "Matter", object2: "Matter") -> None:
@@ -119,88 +398,65 @@ class Collision:
         object2 : Matter
             The second object.
         """
-        # Calculate the normal and tangential vectors
-        normal = (object2.position - object1.position).normalize()
-        tangent = Vector(-normal.y, normal.x)
-
-        # Decompose velocities into normal and tangential components
-        v1n = normal.dot(object1.velocity)
-        v1t = tangent.dot(object1.velocity)
-        v2n = normal.dot(object2.velocity)
-        v2t = tangent.dot(object2.velocity)  # Add this line to define v2t
-
-        # Update normal components using 1D elastic collision formulas
-        total_mass = object1.mass + object2.mass
-        v1n_after = (
-            (object1.mass - object2.mass) * v1n + 2 * object2.mass * v2n
-        ) / total_mass
-        v2n_after = (
-            (object2.mass - object1.mass) * v2n + 2 * object1.mass * v1n
-        ) / total_mass
-
-        # Calculate the new velocities
-        v1_after = normal * v1n_after + tangent * v1t
-        v2_after = normal * v2n_after + tangent * v2t
-
-        # Calculate the force needed to achieve the new velocities
-        force1 = (v1_after - object1.velocity) * object1.mass
-        force2 = (v2_after - object2.velocity) * object2.mass
-
-        # Add the forces as debt to the objects
-        object1.add_debt(force1)
-        object2.add_debt(force2)
-
-        # Update velocities directly
-        object1.velocity = v1_after
-        object2.velocity = v2_after
+        p1, p2 = object1.position._a, object2.position._a
+        v1, v2 = object1.velocity._a, object2.velocity._a
+        m1, m2 = object1.mass, object2.mass
+        v1x, v1y, v1z = float(v1[0]), float(v1[1]), float(v1[2])
+        v2x, v2y, v2z = float(v2[0]), float(v2[1]), float(v2[2])
+        n1x, n1y, n1z, n2x, n2y, n2z = resolve_elastic_3d(
+            float(p1[0]), float(p1[1]), float(p1[2]),
+            float(p2[0]), float(p2[1]), float(p2[2]),
+            v1x, v1y, v1z, v2x, v2y, v2z, m1, m2,
+        )  # fmt: skip
+
+        # Add the forces needed to achieve the new velocities as debt
+        object1.add_debt(Force((n1x - v1x) * m1, (n1y - v1y) * m1, (n1z - v1z) * m1))
+        object2.add_debt(Force((n2x - v2x) * m2, (n2y - v2y) * m2, (n2z - v2z) * m2))
+
+        # Update velocities directly, in place
+        v1[0], v1[1], v1[2] = n1x, n1y, n1z
+        v2[0], v2[1], v2[2] = n2x, n2y, n2z
 
     def _detect_border(object: "Matter", universe: "Universe") -> bool:
         """
         Detects if an object has collided with the border of the space.
+
+        Axes where the universe has a zero dimension are unbounded.
         """
-        return (
-            object.position.x - object.radius < 0
-            or object.position.x + object.radius > universe.dimensions.x
-            or object.position.y - object.radius < 0
-            or object.position.y + object.radius > universe.dimensions.y
-        )
+        # Plain floats beat NumPy calls on three elements
+        r = object.radius
+        for p, d in zip(object.position._a.tolist(), universe.dimensions_arr.tolist()):
+            if d and (p - r < 0 or p + r > d):
+                return True
+        return False
 
     def _resolve_border(object: "Matter", universe: "Universe") -> None:
         """
         Resolves the collision between an object and the border of the space.
         """
         if universe.toroidal:
-            # For toroidal universe, wrap the object's position
-            if object.position.x < 0:
-                object.position.x = universe.dimensions.x
-            elif object.position.x > universe.dimensions.x:
-                object.position.x = 0
-
-            if object.position.y < 0:
-                object.position.y = universe.dimensions.y
-            elif object.position.y > universe.dimensions.y:
-                object.position.y = 0
+            # For toroidal universe, wrap the object to the other side
+            p = object.position._a
+            dims = universe.dimensions_arr
+            np.mod(p, dims, out=p, where=dims != 0)
 
         else:
             # For non-toroidal universe, reverse velocity upon hitting border
-            if (
-                object.position.x - object.radius < 0
-                or object.position.x + object.radius > universe.dimensions.x
-            ):
-                object.velocity.x = -object.velocity.x
-                # Adjust position to ensure object is within bounds
-                object.position.x = max(
-                    object.radius,
-                    min(object.position.x, universe.dimensions.x - object.radius),
-                )
-
-            if (
-                object.position.y - object.radius < 0
-                or object.position.y + object.radius > universe.dimensions.y
-            ):
-                object.velocity.y = -object.velocity.y
-                # Adjust position to ensure object is within bounds
-                object.position.y = max(
-                    object.radius,
-                    min(object.position.y, universe.dimensions.y - object.radius),
-                )
+            p = object.position._a
+            v = object.velocity._a
+            dims = universe.dimensions_arr
+            r = object.radius
+            out = ((p - r < 0) | (p + r > dims)) & (dims != 0)
+            if not out.any():
+                return
+
+            v[out] = -v[out] * universe.restitution
+            # Adjust position to ensure object is within bounds
+            p[out] = np.maximum(r, np.minimum(p[out], dims[out] - r))
+
+
+# Typed entry points without the Matter/Universe dispatch of Collision
+detect_pair = Collision._detect_objects
+detect_border = Collision._detect_border
+resolve_pair = log_event(resolve_log_config)(Collision._resolve_objects)
+resolve_border = log_event(resolve_log_config)(Collision._resolve_border)
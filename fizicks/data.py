@@ -1,9 +1,67 @@
+from itertools import product
+from math import sqrt
+from typing import TYPE_CHECKING, ClassVar, Iterator, Optional
+
+import numpy as np
+
+from fizicks._kernels import (
+    COMPILED_BATCH,
+    GRID_CHUNKS,
+    NUMBA_AVAILABLE,
+    find_grid_pairs,
+    grid_pairs,
+)
+
+try:
+    import simsimd
+except ImportError:  # pragma: no cover - depends on the environment
+    simsimd = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from fizicks.universe import Universe
+
+__all__ = ["Vector", "Force", "Position", "Velocity", "SpatialHash"]
+
+
+def _dot(a: np.ndarray, b: np.ndarray) -> float:
+    """Returns the dot product of two arrays, using SimSIMD when available."""
+    if simsimd is not None and a.dtype == b.dtype:
+        return simsimd.inner(a, b)  # type: ignore[return-value]
+    return float(a @ b)
+
+
+def _sqdist(a: np.ndarray, b: np.ndarray) -> float:
+    """Returns the squared distance between two arrays, using SimSIMD when available."""
+    if simsimd is not None and a.dtype == b.dtype:
+        return simsimd.sqeuclidean(a, b)  # type: ignore[return-value]
+    d = a - b
+    return float(d @ d)
+
+
+# Whether this module was compiled with mypyc, see setup.py
+_COMPILED = not __file__.endswith(".py")
+
+
+def _wrap(cls: type["Vector"], array: np.ndarray) -> "Vector":
+    """Wraps an array in a new cls instance without going through __init__."""
+    if _COMPILED:
+        # Native classes cannot be allocated through object.__new__, and
+        # their __init__ is cheap to call anyway
+        return cls(array=array)
+    # Half the cost of cls(array=array), which matters for operator results
+    vector: Vector = object.__new__(cls)
+    vector._a = array
+    return vector
+
+
 class Vector:
     """
     A vector is a quantity in three-dimensional space that has both magnitude and direction.
 
     Methods
     -------
+    from_array(array: np.ndarray) -> "Vector":
+        Wraps an existing length-3 array without copying it.
     magnitude():
         Returns the magnitude of the vector.
     normalize():
@@ -14,9 +72,22 @@ class Vector:
         Returns a copy of the vector.
     distance(other: "Vector") -> float:
         Returns the distance between two vectors.
+    sqdist(other: "Vector") -> float:
+        Returns the squared distance between two vectors.
     """
 
-    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+    __slots__ = ("_a",)
+
+    _a: np.ndarray
+
+    def __init__(
+        self,
+        x: float = 0.0,
+        y: float = 0.0,
+        z: float = 0.0,
+        *,
+        array: Optional[np.ndarray] = None,
+    ) -> None:
         """
         Initializes the vector with the given x, y, and z coordinates.
 
@@ -28,92 +99,452 @@ class Vector:
             The y coordinate of the vector.
         z : float
             The z coordinate of the vector.
+        array : np.ndarray, optional
+            An existing length-3 array to wrap instead of the coordinates.
         """
-        self.x = x
-        self.y = y
-        self.z = z
+        if array is None:
+            array = np.array([x, y, z], dtype=np.float64)
+        self._a = array
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "Vector":
+        """
+        Wraps an existing length-3 array without copying it.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            The array holding the x, y, and z coordinates.
+        """
+        return _wrap(cls, array)
+
+    @property
+    def x(self) -> float:
+        return float(self._a[0])
+
+    @x.setter
+    def x(self, value: float) -> None:
+        self._a[0] = value
+
+    @property
+    def y(self) -> float:
+        return float(self._a[1])
+
+    @y.setter
+    def y(self, value: float) -> None:
+        self._a[1] = value
+
+    @property
+    def z(self) -> float:
+        return float(self._a[2])
+
+    @z.setter
+    def z(self, value: float) -> None:
+        self._a[2] = value
 
     def __add__(self, other: "Vector") -> "Vector":
-        return self.__class__(self.x + other.x, self.y + other.y, self.z + other.z)
+        return _wrap(type(self), self._a + other._a)
 
     def __sub__(self, other: "Vector") -> "Vector":
-        return self.__class__(self.x - other.x, self.y - other.y, self.z - other.z)
+        return _wrap(type(self), self._a - other._a)
 
     def __mul__(self, other: float) -> "Vector":
-        return self.__class__(self.x * other, self.y * other, self.z * other)
+        return _wrap(type(self), self._a * other)
 
     def __truediv__(self, other: float) -> "Vector":
-        return self.__class__(
-            int(self.x / other), int(self.y / other), int(self.z / other)
-        )
+        return _wrap(type(self), self._a * (1.0 / other))
+
+    def __iadd__(self, other: "Vector") -> "Vector":
+        self._a += other._a
+        return self
 
-    def __eq__(self, other: "Vector") -> bool:
-        return self.x == other.x and self.y == other.y and self.z == other.z
+    def __isub__(self, other: "Vector") -> "Vector":
+        self._a -= other._a
+        return self
 
-    def __ne__(self, other: "Vector") -> bool:
+    def __imul__(self, other: float) -> "Vector":
+        self._a *= other
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Vector):
+            return NotImplemented
+        return bool((self._a == other._a).all())
+
+    def __ne__(self, other: object) -> bool:
         return not self == other
 
-    def __repr__(self):
-        return f"{self.__class__.__name__}({self.x}, {self.y}, {self.z})"
+    def __repr__(self) -> str:
+        x, y, z = self._a.tolist()
+        return f"{self.__class__.__name__}({x}, {y}, {z})"
 
-    def __str__(self):
-        return f"{self.__class__.__name__}({self.x}, {self.y}, {self.z})"
+    def __str__(self) -> str:
+        return self.__repr__()
 
-    def __mod__(self, other):
-        return Vector(
-            self.x % other.x if other.x != 0 else self.x,
-            self.y % other.y if other.y != 0 else self.y,
-            self.z % other.z if other.z != 0 else self.z,
-        )
+    def __mod__(self, other: "Vector") -> "Vector":
+        result = self._a.copy()
+        np.mod(self._a, other._a, out=result, where=other._a != 0)
+        return _wrap(Vector, result)
 
-    def __iter__(self):
+    def __array__(
+        self, dtype: Optional[np.dtype] = None, copy: Optional[bool] = None
+    ) -> np.ndarray:
+        """Returns the backing array, so NumPy functions accept vectors directly."""
+        if copy:
+            return self._a.copy() if dtype is None else self._a.astype(dtype)
+        if copy is False and dtype is not None and np.dtype(dtype) != self._a.dtype:
+            raise ValueError("Unable to avoid a copy while converting the vector")
+        return np.asarray(self._a, dtype=dtype)
+
+    def __iter__(self) -> Iterator[float]:
         """Returns an iterator over the vector."""
-        return iter((self.x, self.y, self.z))
+        return iter(self._a.tolist())
 
-    def __call__(self):
+    def __call__(self) -> tuple[float, ...]:
         """Returns the vector as a tuple."""
-        return (self.x, self.y, self.z)
+        return tuple(self._a.tolist())
 
     def magnitude(self) -> float:
         """Returns the magnitude of the vector."""
-        return (self.x**2 + self.y**2 + self.z**2) ** 0.5
+        return sqrt(_dot(self._a, self._a))
 
     def normalize(self) -> "Vector":
         """Returns the normalized vector."""
         mag = self.magnitude()
         if mag == 0:
             return Vector(0, 0, 0)  # Return a zero vector if magnitude is zero
-        return self / mag
+        return _wrap(type(self), self._a * (1.0 / mag))
 
     def dot(self, other: "Vector") -> float:
         """Returns the dot product of two vectors."""
-        return self.x * other.x + self.y * other.y + self.z * other.z
+        return _dot(self._a, other._a)
 
     def copy(self) -> "Vector":
         """Returns a copy of the vector."""
-        return self.__class__(self.x, self.y, self.z)
+        return _wrap(type(self), self._a.copy())
 
     def distance(self, other: "Vector") -> float:
         """Returns the distance between two vectors."""
-        return (self - other).magnitude()
+        return sqrt(_sqdist(self._a, other._a))
+
+    def sqdist(self, other: "Vector") -> float:
+        """Returns the squared distance between two vectors."""
+        return _sqdist(self._a, other._a)
 
 
 class Force(Vector):
     """A force is a vector that describes the change in momentum of an object over time."""
 
-    def __init__(self, x: float, y: float, z: float):
-        super().__init__(x, y, z)
+    __slots__ = ()
 
 
 class Position(Vector):
     """The position of an object is a vector that describes its location in space."""
 
-    def __init__(self, x: float, y: float, z: float):
-        super().__init__(x, y, z)
+    __slots__ = ()
 
 
 class Velocity(Vector):
     """The velocity of an object is a vector that describes its speed and direction in space."""
 
-    def __init__(self, x: float, y: float, z: float):
-        super().__init__(x, y, z)
+    __slots__ = ()
+
+
+# Cell coordinates are packed into one int64 key with this many bits per
+# axis, biased to be non-negative, so sorting and lookups use one integer
+# instead of three
+_KEY_BITS = 21
+_KEY_BIAS = 1 << (_KEY_BITS - 1)
+
+
+def _spread_bits(x: np.ndarray) -> np.ndarray:
+    """Spaces out the low 21 bits of x to every third bit, for Morton codes."""
+    x = x.astype(np.uint64)
+    x = (x | (x << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return x
+
+
+# The Cython `grid_pairs`, used without Numba if built, has no buffered
+# counterpart, so it keeps counting and filling in two passes
+_BUFFERED_PAIRS = NUMBA_AVAILABLE or not COMPILED_BATCH
+
+
+# Built outside the class body, which mypyc cannot refer back to from
+# within it
+_NEIGHBORS = [
+    (dx << 2 * _KEY_BITS) + (dy << _KEY_BITS) + dz
+    for dx, dy, dz in product((-1, 0, 1), repeat=3)
+    if (dx, dy, dz) > (0, 0, 0)
+]
+
+
+class SpatialHash:
+    """
+    A uniform grid that buckets objects by the cell their position falls in.
+
+    Objects can only collide with objects in their own cell or one of the
+    26 cells around it, so the broad phase only has to look at those instead
+    of every other object in the universe. Following Teschner et al., the
+    cell size defaults to the largest object diameter, which guarantees that
+    two overlapping objects are never more than one cell apart.
+
+    The buckets are stored CSR-style: `order` holds the object indices sorted
+    by cell, and the objects of cell `c` are
+    `order[cell_start[c]:cell_start[c + 1]]`. `keys` holds the sorted packed
+    int64 key of every occupied cell.
+
+    Parameters
+    ----------
+    cell_size : float, optional
+        The edge length of a grid cell. Defaults to twice the largest radius.
+
+    Methods
+    -------
+    build(positions: np.ndarray, radii: np.ndarray) -> None
+        Buckets the given positions into grid cells.
+    query_pairs(universe: Universe) -> Iterator[tuple[int, int]]
+        Yields the index pairs of objects in the same or neighboring cells.
+    neighbor_cells() -> np.ndarray
+        Returns the occupied forward neighbors of every occupied cell.
+    colliding_pairs(universe: Universe, active_only: bool) -> np.ndarray
+        Returns the index pairs of overlapping objects, found in compiled code.
+    morton_order(positions: np.ndarray, radii: np.ndarray) -> np.ndarray
+        Returns the object indices sorted by the Morton code of their cell.
+    permute(perm: np.ndarray) -> None
+        Renumbers the objects of the last build after they were reordered.
+    """
+
+    # Key offsets of half of the 26 neighboring cells, so each pair of cells
+    # is visited once
+    NEIGHBORS: ClassVar[list[int]] = _NEIGHBORS
+    NEIGHBOR_OFFSETS: ClassVar[np.ndarray] = np.array(_NEIGHBORS, dtype=np.int64)
+
+    def __init__(self, cell_size: Optional[float] = None) -> None:
+        self.cell_size = cell_size
+        self.keys = np.empty(0, dtype=np.int64)
+        self.order = np.empty(0, dtype=np.int32)
+        self.cell_start = np.zeros(1, dtype=np.int32)
+        # The cell key of every object as of the last build
+        self._object_keys = np.empty(0, dtype=np.int64)
+        # Scratch for `colliding_pairs`, kept across calls and only grown
+        self._pairs = np.empty((GRID_CHUNKS * 64, 2), dtype=np.int32)
+        self._pair_counts = np.empty(GRID_CHUNKS, dtype=np.int64)
+
+    def build(self, positions: np.ndarray, radii: np.ndarray) -> None:
+        """
+        Buckets the given positions into grid cells.
+
+        Objects rarely change cells between time steps, so the grid from the
+        previous build is reused: it is kept as is if no object changed
+        cells, and otherwise its order is re-sorted, which is much cheaper
+        than sorting from scratch when the order is nearly right already.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            An (N, 3) array of object positions.
+        radii : np.ndarray
+            An (N,) array of object radii.
+        """
+        if len(radii) == 0 or (self.cell_size is None and radii.max() <= 0):
+            self.keys = np.empty(0, dtype=np.int64)
+            self.order = np.empty(0, dtype=np.int32)
+            self.cell_start = np.zeros(1, dtype=np.int32)
+            self._object_keys = np.empty(0, dtype=np.int64)
+            return
+
+        cell_size = self.cell_size or 2 * float(radii.max())
+        # Scale by the reciprocal, since multiplying is cheaper than dividing
+        scaled = positions * (1.0 / cell_size)
+        coords = np.floor(scaled, out=scaled).astype(np.int64)
+
+        # Far away objects share the outermost cells, which only costs extra
+        # candidates; the margin keeps the neighbors of every cell in range
+        np.clip(coords, 1 - _KEY_BIAS, _KEY_BIAS - 2, out=coords)
+        coords += _KEY_BIAS
+        keys = coords[:, 0] << 2 * _KEY_BITS
+        keys |= coords[:, 1] << _KEY_BITS
+        keys |= coords[:, 2]
+
+        if len(keys) == len(self._object_keys):
+            if np.array_equal(keys, self._object_keys):
+                return
+            # Sort by cell with x as the primary key, starting from the
+            # previous order
+            previous = self.order
+            order: np.ndarray = previous[np.argsort(keys[previous], kind="stable")]
+        else:
+            order = np.argsort(keys, kind="stable")
+        self._object_keys = keys
+        keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+        self.keys = keys[starts]
+        self.order = order.astype(np.int32, copy=False)
+        self.cell_start = np.append(starts, len(order)).astype(np.int32)
+
+    def morton_order(self, positions: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """
+        Returns the object indices sorted by the Morton code of their cell.
+
+        The Morton code interleaves the bits of the cell coordinates, so
+        objects in nearby cells mostly end up near each other in the order.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            An (N, 3) array of object positions.
+        radii : np.ndarray
+            An (N,) array of object radii.
+
+        Returns
+        -------
+        np.ndarray
+            The permutation that sorts the objects along the Morton curve.
+        """
+        if len(radii) == 0 or (self.cell_size is None and radii.max() <= 0):
+            return np.arange(len(radii))
+        cell_size = self.cell_size or 2 * float(radii.max())
+        scaled = positions * (1.0 / cell_size)
+        coords = np.floor(scaled, out=scaled).astype(np.int64)
+        coords -= coords.min(axis=0)
+        np.clip(coords, 0, (1 << _KEY_BITS) - 1, out=coords)
+        codes = _spread_bits(coords[:, 0]) << np.uint64(2)
+        codes |= _spread_bits(coords[:, 1]) << np.uint64(1)
+        codes |= _spread_bits(coords[:, 2])
+        return np.argsort(codes, kind="stable")
+
+    def permute(self, perm: np.ndarray) -> None:
+        """
+        Renumbers the objects of the last build after they were reordered.
+
+        Keeps the grid valid for the new numbering, so the next build can
+        still skip or warm start its sort.
+
+        Parameters
+        ----------
+        perm : np.ndarray
+            The permutation applied to the objects: new object i was object
+            `perm[i]`.
+        """
+        if len(perm) != len(self._object_keys):
+            return
+        new_index = np.empty_like(perm)
+        new_index[perm] = np.arange(len(perm))
+        self._object_keys = self._object_keys[perm]
+        self.order = new_index[self.order].astype(np.int32)
+
+    def query_pairs(self, universe: "Universe") -> Iterator[tuple[int, int]]:
+        """
+        Yields the index pairs of objects in the same or neighboring cells.
+
+        The grid is rebuilt from the universe's structure-of-arrays buffers,
+        so `Universe.sync_arrays` must be called first.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe whose objects to pair up.
+
+        Yields
+        ------
+        tuple[int, int]
+            Candidate object index pairs (i, j) with i < j.
+        """
+        self.build(universe.positions, universe.radii)
+        order = self.order.tolist()
+        bounds = self.cell_start.tolist()
+        cells = [order[start:end] for start, end in zip(bounds, bounds[1:])]
+
+        for members, neighbors in zip(cells, self.neighbor_cells().tolist()):
+            for a, i in enumerate(members):
+                for j in members[a + 1 :]:
+                    yield (i, j) if i < j else (j, i)
+
+            for n in neighbors:
+                if n < 0:
+                    continue
+                for i in members:
+                    for j in cells[n]:
+                        yield (i, j) if i < j else (j, i)
+
+    def neighbor_cells(self) -> np.ndarray:
+        """
+        Returns the occupied forward neighbors of every occupied cell.
+
+        All lookups are done at once with a binary search of the sorted
+        cell keys, instead of probing a dict per cell and neighbor.
+
+        Returns
+        -------
+        np.ndarray
+            A (C, 13) array whose row c holds, for each offset in
+            `NEIGHBORS`, the index of that neighbor of cell c, or -1 if it
+            is empty.
+        """
+        keys = self.keys
+        if len(keys) == 0:
+            return np.empty((0, len(self.NEIGHBORS)), dtype=np.int64)
+        targets = keys[:, None] + self.NEIGHBOR_OFFSETS
+        found = np.searchsorted(keys, targets)
+        hits = keys[np.minimum(found, len(keys) - 1)] == targets
+        return np.where(hits, found, -1)
+
+    def colliding_pairs(
+        self, universe: "Universe", active_only: bool = False
+    ) -> np.ndarray:
+        """
+        Returns the index pairs of overlapping objects, found in compiled code.
+
+        Rebuilds the grid like `query_pairs`, then walks the cells and runs
+        the exact overlap check in a single Numba kernel instead of yielding
+        candidates to Python. The kernel is generated with the neighbor
+        offsets built in, see `specialize_grid_pairs`. The pairs are found
+        in one pass into a scratch buffer kept between calls, which is only
+        grown, and searched again, when it turns out to be too small.
+        `Universe.sync_arrays` must be called first.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe whose objects to pair up.
+        active_only : bool
+            Whether to skip pairs of two objects at rest.
+
+        Returns
+        -------
+        np.ndarray
+            An (M, 2) int32 array of object indices with i < j for every row.
+        """
+        self.build(universe.positions, universe.radii)
+        if active_only:
+            active = universe.active
+        else:
+            active = np.ones(len(universe.radii), dtype=np.bool_)
+        if not _BUFFERED_PAIRS:
+            return grid_pairs(
+                self.keys,
+                self.order,
+                self.cell_start,
+                self.NEIGHBOR_OFFSETS,
+                universe.positions,
+                universe.radii,
+                active,
+            )
+
+        count, self._pairs = find_grid_pairs(
+            self.keys,
+            self.order,
+            self.cell_start,
+            tuple(self.NEIGHBORS),
+            universe.positions,
+            universe.radii,
+            active,
+            self._pairs,
+            self._pair_counts,
+        )
+        return self._pairs[:count].copy()
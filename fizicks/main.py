@@ -17,6 +17,8 @@ class Fizicks:
     -------
     update(object, universe)
         Updates the object's state by applying rigid motion physics.
+    step(universe)
+        Advances every object in the universe by one time step.
     """
 
     @classmethod
@@ -34,3 +36,15 @@ class Fizicks:
             The space to apply the physics to.
         """
         Motion.update(object, universe, debug=debug)
+
+    @classmethod
+    def step(cls, universe: "Universe", debug: bool = False) -> None:
+        """
+        Advances every object in the universe by one time step.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe to advance.
+        """
+        Motion.step(universe, debug=debug)
@@ -1,8 +1,10 @@
-import uuid
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
 
 from fizicks.data import Force, Position, Velocity
 from fizicks.main import Fizicks
+from fizicks.universe import next_id
 
 if TYPE_CHECKING:
     from fizicks.data import Vector
@@ -26,7 +28,8 @@ class Matter:
     color : tuple[int, int, int]
         The color of the object.
     debt : list[Force]
-        The list of forces to apply to the object.
+        The list of forces to apply to the object, while it is not in a
+        universe.
 
     Methods
     -------
@@ -47,8 +50,37 @@ class Matter:
         The position of the object in the universe.
     velocity : Velocity
         The velocity of the object in the universe.
+    mass : float
+        The mass of the object.
+    radius : float
+        The radius of the object.
+    color : tuple[int, int, int]
+        The color of the object.
+    acceleration : Velocity
+        The acceleration of the object, derived from its velocity and mass.
+
+    Setting the position or velocity copies the value into the object's own
+    vector, so objects never share one.
+
+    Once the object is added to a universe, `universe` and `index` point to
+    its row of the universe's structure-of-arrays buffers. Its position and
+    velocity are then views into that row, and setting any of the properties
+    writes through to the buffers.
     """
 
+    __slots__ = (
+        "id",
+        "time",
+        "_position",
+        "_velocity",
+        "_mass",
+        "_radius",
+        "_color",
+        "debt",
+        "universe",
+        "index",
+    )
+
     def __init__(
         self,
         position: "Position",
@@ -57,25 +89,35 @@ class Matter:
         radius: float,
         color: tuple[int, int, int] = (255, 255, 255),
     ) -> None:
-        self.id = uuid.uuid4()
+        self.id = next_id()
         self.time = 0
-        self._position: Position = position
-        self._velocity: Velocity = velocity
-        self.mass: float = mass
-        self.radius: float = radius
-        self.color: tuple[int, int, int] = color
+        # Own copies, since the laws of motion update them in place
+        self._position = Position(array=np.array(position, dtype=np.float64))
+        self._velocity = Velocity(array=np.array(velocity, dtype=np.float64))
+        self._mass: float = mass
+        self._radius: float = radius
+        self._color: tuple[int, int, int] = color
         self.debt: list[Force] = []
+        self.universe: Optional["Universe"] = None
+        self.index: Optional[int] = None
 
     def add_debt(self, force: "Force") -> None:
         """
         Add a force to the object's debt.
 
+        Once the object is in a universe, the force is added to its row of
+        the universe's net debt buffer instead of the `debt` list.
+
         Parameters
         ----------
         force : Force
             The force to apply to the object.
         """
-        self.debt.append(force)
+        if self.universe is None:
+            self.debt.append(force)
+        else:
+            self.universe.debt[self.index] += force._a
+            self.universe.active[self.index] = True
 
     def update(self, universe: "Universe", debug: bool = False) -> None:
         """
@@ -87,19 +129,23 @@ class Matter:
             The universe to update the object in.
         """
         Fizicks.update(self, universe, debug=debug)
-        self.debt = []  # Clear forces after applying
+        self.debt.clear()  # Clear forces after applying, keeping the list
         self.time += 1
 
     def collides_with(self, other: "Matter") -> bool:
         """
         Check if the object collides with another object.
 
+        Objects collide when they overlap, like in `Collision.detect`, so
+        objects that only touch do not.
+
         Parameters
         ----------
         other : Matter
             The object to check for collision with.
         """
-        return self.position.distance(other.position) <= self.radius + other.radius
+        radius_sum = self.radius + other.radius
+        return self.position.sqdist(other.position) < radius_sum * radius_sum
 
     def description(self, short: bool = True) -> str:
         if short:
@@ -119,7 +165,13 @@ class Matter:
 
     @position.setter
     def position(self, value: "Vector") -> None:
-        self._position = Position(*value)
+        # Copy into the object's own vector, or its row of the universe, so
+        # that no two objects share one. Skip the copy if the vector was
+        # already updated in place by +=
+        if value is not self._position:
+            self._position._a[:] = value
+        if self.universe is not None:
+            self.universe.active[self.index] = True
 
     @property
     def velocity(self) -> "Velocity":
@@ -127,4 +179,45 @@ class Matter:
 
     @velocity.setter
     def velocity(self, value: "Vector") -> None:
-        self._velocity = Velocity(*value)
+        # Copy into the object's own vector, or its row of the universe, so
+        # that no two objects share one. Skip the copy if the vector was
+        # already updated in place by +=
+        if value is not self._velocity:
+            self._velocity._a[:] = value
+        if self.universe is not None:
+            self.universe.active[self.index] = True
+
+    @property
+    def acceleration(self) -> "Velocity":
+        # Derived on demand, so the laws of motion never have to store it
+        return self._velocity / self._mass
+
+    @property
+    def mass(self) -> float:
+        return self._mass
+
+    @mass.setter
+    def mass(self, value: float) -> None:
+        self._mass = value
+        if self.universe is not None:
+            self.universe.masses[self.index] = value
+
+    @property
+    def radius(self) -> float:
+        return self._radius
+
+    @radius.setter
+    def radius(self, value: float) -> None:
+        self._radius = value
+        if self.universe is not None:
+            self.universe.radii[self.index] = value
+
+    @property
+    def color(self) -> tuple[int, int, int]:
+        return self._color
+
+    @color.setter
+    def color(self, value: tuple[int, int, int]) -> None:
+        self._color = value
+        if self.universe is not None:
+            self.universe.colors[self.index] = value
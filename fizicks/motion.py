@@ -1,9 +1,13 @@
 from typing import TYPE_CHECKING, Any
 
-from fizicks.collision import Collision
+import numpy as np
+
+from fizicks import _cuda
+from fizicks._kernels import specialize_integrate
+from fizicks.collision import Collision, detect_border, resolve_border
+from fizicks.data import Force
 
 if TYPE_CHECKING:
-    from fizicks.data import Force
     from fizicks.matter import Matter
     from fizicks.universe import Universe
 
@@ -29,7 +33,7 @@ class FirstLaw:
             debug_log(
                 f"Step {object.time}: Applying force: {force} to {object.id}", object
             )
-        object.velocity = object.velocity + force
+        object.velocity += force
         if debug:
             debug_log(f"Updated velocity: {object.velocity}", object)
 
@@ -57,12 +61,12 @@ class SecondLaw:
                 object,
             )
 
-        object.position = object.position + object.velocity
+        object.position += object.velocity
         if debug:
             debug_log(f"Updated position: {object.position}", object)
 
-        if Collision.detect(object, universe):
-            Collision.resolve(object, universe)
+        if detect_border(object, universe):
+            resolve_border(object, universe)
 
 
 class ThirdLaw:
@@ -73,6 +77,9 @@ class ThirdLaw:
         """
         Updates the acceleration of the object based on the velocity and mass.
 
+        The acceleration is not stored: `Matter.acceleration` derives it
+        from the velocity and mass whenever it is read, so this only logs it.
+
         Parameters
         ----------
         object : Matter
@@ -80,12 +87,6 @@ class ThirdLaw:
         debug : bool
             Whether to print debug information.
         """
-        if debug:
-            debug_log(
-                f"Step {object.time}: Applying force: {object.velocity / object.mass} to {object.id}",
-                object,
-            )
-        object.acceleration = object.velocity / object.mass
         if debug:
             debug_log(f"Updated acceleration: {object.acceleration}", object)
 
@@ -98,6 +99,10 @@ class Motion:
     1. Check for collisions with objects or boundaries.
     2. Apply the forces to the object.
     3. Update the object's state based on the forces applied and its current state.
+
+    `step` runs this process for every object in a universe at once, over
+    the universe's structure-of-arrays buffers, after resolving all object
+    collisions found through the universe's spatial hash in one batch.
     """
 
     @classmethod
@@ -114,14 +119,18 @@ class Motion:
         debug : bool
             Whether to print debug information.
         """
+        if not debug:
+            cls._update_fast(object, universe)
+            return
+
         # Check for collisions with the universe
-        if Collision.detect(object, universe):
+        if detect_border(object, universe):
             if debug:
                 debug_log(
                     f"Step {object.time}: Collision detected between {object.id} and {universe.id}",
                     object,
                 )
-            Collision.resolve(object, universe)
+            resolve_border(object, universe)
 
         # Apply the forces of motion
         if object.debt:
@@ -131,5 +140,176 @@ class Motion:
                 )
             for debt in object.debt:
                 FirstLaw.apply(object, debt, debug=debug)
+
+        # Objects in a universe owe their net force in the universe's debt row
+        home = getattr(object, "universe", None)
+        if home is not None and home.debt[object.index].any():
+            FirstLaw.apply(object, Force.from_array(home.debt[object.index]), debug)
+            home.debt[object.index] = 0
         SecondLaw.apply(object, universe, debug=debug)
         ThirdLaw.apply(object, debug=debug)
+
+    @staticmethod
+    def _update_fast(object: Any, universe: "Universe") -> None:
+        """
+        Runs the process of `update` with the object's state bound to locals.
+
+        The vectors are updated in place and written back once at the end,
+        instead of going through the properties and the law classes for
+        every step of the process.
+        """
+        position = object.position
+        velocity = object.velocity
+        if detect_border(object, universe):
+            resolve_border(object, universe)
+
+        # First law
+        for debt in object.debt:
+            velocity += debt
+        home = getattr(object, "universe", None)
+        if home is not None:
+            owed = home.debt[object.index]
+            if owed.any():
+                velocity._a += owed
+                owed.fill(0)
+
+        # Second law
+        position += velocity
+        if detect_border(object, universe):
+            resolve_border(object, universe)
+
+        # Third law: acceleration is derived from the velocity when read
+        object.velocity = velocity
+        object.position = position
+
+    @classmethod
+    def step(cls, universe: "Universe", debug: bool = False) -> None:
+        """
+        Advances every object in the universe by one time step.
+
+        Runs the same process as `update`, but over the universe's
+        structure-of-arrays buffers, with the three laws fused into one
+        kernel: a parallel Numba kernel if Numba is installed, a blocked
+        NumPy one otherwise. The Numba kernel is generated for the
+        universe's dimensions and border behaviour, and is compiled the
+        first time a configuration is stepped, see `specialize_integrate`.
+        Every `reorder_interval` steps, the universe's buffers are first
+        sorted along the Morton curve, see `Universe.reorder`. With debug
+        enabled the objects are updated one by one instead, so that every
+        step can be logged.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe to advance.
+        debug : bool
+            Whether to print debug information.
+        """
+        universe.sync_arrays()
+        # Writes to single vector components bypass the object's properties,
+        # so wake every object that is moving or owes a force
+        universe.active |= np.any(universe.velocities != 0, axis=1)
+        universe.active |= np.any(universe.debt != 0, axis=1)
+        interval = universe.reorder_interval
+        if interval and universe.time % interval == 0:
+            universe.reorder()
+        pairs = Collision.detect_pair_array(universe, active_only=True)
+        Collision.resolve_batch(universe, pairs)
+
+        if debug:
+            for object in universe.objects:
+                object.update(universe, debug=debug)
+            universe.time += 1
+            return
+
+        for object in universe.objects:
+            object.time += 1
+
+        integrate = specialize_integrate(
+            tuple(universe.dimensions_arr.tolist()),
+            bool(universe.toroidal),
+        )
+        integrate(
+            universe.positions,
+            universe.velocities,
+            universe.debt,
+            universe.radii,
+            universe.active,
+            float(universe.restitution),
+        )
+
+        universe.debt.fill(0)
+        universe.time += 1
+
+    @classmethod
+    def run(cls, universe: "Universe", steps: int, use_cuda: bool = False) -> None:
+        """
+        Advances every object in the universe by several time steps.
+
+        With `use_cuda` and a usable GPU, the state is copied to the device
+        once, every step runs there, and the result is copied back at the
+        end. Collisions are then found by testing all pairs in tiles, which
+        suits the GPU better than a spatial hash. Otherwise `step` is called
+        `steps` times.
+
+        Parameters
+        ----------
+        universe : Universe
+            The universe to advance.
+        steps : int
+            The number of time steps to advance by.
+        use_cuda : bool
+            Whether to run the steps on the GPU if one is available.
+        """
+        if not (use_cuda and _cuda.available()):
+            for _ in range(steps):
+                cls.step(universe)
+            return
+
+        universe.sync_arrays()
+        n = len(universe.objects)
+        if n:
+            cuda = _cuda.cuda
+            device = {
+                name: cuda.to_device(getattr(universe, name))
+                for name in (
+                    "positions",
+                    "velocities",
+                    "debt",
+                    "masses",
+                    "radii",
+                )
+            }
+            dv = cuda.device_array((n, 3), dtype=np.float64)
+            dims = cuda.to_device(universe.dimensions_arr)
+            blocks = _cuda.blocks_for(n)
+            threads = _cuda.THREADS_PER_BLOCK
+
+            for _ in range(steps):
+                _cuda.collide[blocks, threads](
+                    device["positions"],
+                    device["velocities"],
+                    device["masses"],
+                    device["radii"],
+                    dv,
+                )
+                _cuda.integrate[blocks, threads](
+                    device["positions"],
+                    device["velocities"],
+                    device["debt"],
+                    device["masses"],
+                    device["radii"],
+                    dv,
+                    dims,
+                    universe.toroidal,
+                    universe.restitution,
+                )
+
+            # The objects view these buffers, so copy into them in place
+            for name in ("positions", "velocities", "debt"):
+                device[name].copy_to_host(getattr(universe, name))
+            np.any(universe.velocities != 0, axis=1, out=universe.active)
+
+        for object in universe.objects:
+            object.time += steps
+        universe.time += steps
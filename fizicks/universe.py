@@ -1,12 +1,33 @@
-import uuid
+import os
 from abc import ABC, abstractmethod
+from itertools import count
+from typing import TYPE_CHECKING
 
-from fizicks.data import Vector
+import numpy as np
+
+from fizicks.data import Force, Position, SpatialHash, Vector, Velocity
+
+if TYPE_CHECKING:
+    from fizicks.matter import Matter
+
+#: Storage type of the structure-of-arrays buffers, float32 unless the
+#: FIZICKS_DTYPE environment variable asks for float64
+_dtype = os.environ.get("FIZICKS_DTYPE", "float32")
+if _dtype not in ("float32", "float64"):
+    raise ValueError(f"FIZICKS_DTYPE must be float32 or float64, not {_dtype!r}")
+DTYPE = np.dtype(_dtype).type
+
+_ids = count()
+
+
+def next_id() -> int:
+    """Returns a new object id, unique within the running process."""
+    return next(_ids)
 
 
 class FizicksObject(ABC):
     def __init__(self, **kwargs) -> None:
-        self.id = uuid.uuid4()
+        self.id = next_id()
         self.time = 0
         self.debug = kwargs.get("debug", False)
 
@@ -16,6 +37,62 @@ class FizicksObject(ABC):
 
 
 class Universe(FizicksObject):
+    """
+    The universe holds the objects being simulated and the physical
+    constants that apply to them.
+
+    The state of the objects (positions, velocities, net force debt, radii,
+    masses and colors) is stored structure-of-arrays style on the universe,
+    so that whole-universe operations like collision detection and
+    integration run as a handful of NumPy calls instead of per-object
+    Python calls. Once an object has been added, its position and velocity
+    are views into its row of these buffers, and setting them writes into
+    the row.
+
+    The buffers are stored as `DTYPE` (float32), which halves the memory
+    traffic of the bandwidth-bound batch operations and is plenty for
+    collision geometry. Set the FIZICKS_DTYPE environment variable to
+    float64 before importing fizicks for double precision. Objects that do
+    not belong to a universe keep float64 Vectors of their own.
+
+    The `active` buffer flags the objects that need to be stepped. An
+    object falls asleep once it comes to rest, and is woken up again when
+    it is collided with, owes a force, or has its state set through its
+    properties. `Motion.step` also wakes every object with a nonzero
+    velocity or debt row before it runs, which covers writes to single
+    vector components and direct writes to the buffers.
+
+    Properties
+    ----------
+    dimensions : Vector
+        The dimensions of the universe. Can be set from any length-3
+        sequence; zero dimensions are unbounded.
+    dimensions_arr : np.ndarray
+        The dimensions of the universe as a length-3 `DTYPE` array.
+
+    Methods
+    -------
+    add_object(object: Matter)
+        Adds an object to the universe and moves its state into the buffers.
+    sync_arrays()
+        Attaches any objects added directly to `objects` to the buffers.
+    broadphase_pairs() -> np.ndarray
+        Returns the index pairs of objects whose radii overlap.
+    reorder()
+        Sorts the objects and their rows along the Morton curve of the grid.
+    """
+
+    # Structure-of-arrays buffers and the row shape and dtype of each
+    _FIELDS = {
+        "positions": ((3,), DTYPE),
+        "velocities": ((3,), DTYPE),
+        "debt": ((3,), DTYPE),
+        "radii": ((), DTYPE),
+        "masses": ((), DTYPE),
+        "active": ((), np.bool_),
+        "colors": ((3,), np.uint8),
+    }
+
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
         self.id = "Universe"
@@ -30,7 +107,201 @@ class Universe(FizicksObject):
         self.air_resistance_coefficient = kwargs.get("air_resistance_coefficient", 0)
         self.air_resistance_area = kwargs.get("air_resistance_area", 0)
         self.air_resistance_density = kwargs.get("air_resistance_density", 0)
+        # Time steps between reorders of the buffers, 0 to never reorder.
+        # Reordering renumbers the objects, so it is off by default
+        self.reorder_interval = kwargs.get("reorder_interval", 0)
         self.objects = []
+        self.positions = np.empty((0, 3), dtype=DTYPE)
+        self.velocities = np.empty((0, 3), dtype=DTYPE)
+        self.debt = np.empty((0, 3), dtype=DTYPE)
+        self.radii = np.empty(0, dtype=DTYPE)
+        self.masses = np.empty(0, dtype=DTYPE)
+        self.active = np.empty(0, dtype=np.bool_)
+        self.colors = np.empty((0, 3), dtype=np.uint8)
+        self.spatial_hash = SpatialHash()
+        self._buffers = {name: getattr(self, name) for name in self._FIELDS}
+        # The objects bound to the rows, as of the last sync
+        self._attached: list["Matter"] = []
+
+    @property
+    def dimensions(self) -> Vector:
+        return self._dimensions
+
+    @dimensions.setter
+    def dimensions(self, value: Vector) -> None:
+        # Stored as DTYPE once, so the batch code can use it without a copy
+        self._dimensions = Vector(array=np.array(value, dtype=DTYPE))
+
+    @property
+    def dimensions_arr(self) -> np.ndarray:
+        """The dimensions of the universe as a length-3 `DTYPE` array."""
+        return self._dimensions._a
+
+    def add_object(self, object: "Matter") -> None:
+        """
+        Adds an object to the universe and moves its state into the buffers.
+
+        The buffers grow geometrically, so adding objects one at a time is
+        amortized constant time.
+
+        Parameters
+        ----------
+        object : Matter
+            The object to add.
+        """
+        self.objects.append(object)
+        if len(self._attached) != len(self.objects) - 1:
+            # Objects were added or removed through `objects` as well
+            self.sync_arrays()
+            return
+
+        if self._resize(len(self.objects)):
+            self._rebind()
+        else:
+            self._attach(object, len(self.objects) - 1)
+        self._attached.append(object)
+
+    def sync_arrays(self) -> None:
+        """
+        Attaches any objects added directly to `objects` to the buffers.
+
+        Objects that are already attached at their index are left alone, so
+        this is cheap when nothing has changed. Objects that were removed
+        from `objects` are detached first: their state is copied out of the
+        buffers into vectors of their own, so reusing their rows does not
+        change them. Removed objects are detached here or in the next
+        `add_object`, whichever comes first.
+        """
+        objects = self.objects
+        if len(objects) == len(self._attached) and all(
+            object.universe is self and object.index == i
+            for i, object in enumerate(objects)
+        ):
+            return
+
+        kept = {id(object) for object in objects}
+        for object in self._attached:
+            if id(object) not in kept and object.universe is self:
+                self._detach(object)
+
+        if self._resize(len(objects)):
+            self._rebind()
+        else:
+            for i, object in enumerate(objects):
+                if object.universe is not self or object.index != i:
+                    self._attach(object, i)
+        self._attached = list(objects)
+
+    def _resize(self, n: int) -> bool:
+        """
+        Resizes the buffers to hold n objects.
+
+        Returns True if the buffers had to be reallocated, in which case the
+        objects still view the old memory and must be rebound.
+        """
+        capacity = len(self._buffers["positions"])
+        grown = n > capacity
+        for name, (shape, dtype) in self._FIELDS.items():
+            if grown:
+                buffer = np.zeros((max(n, 2 * capacity), *shape), dtype=dtype)
+                buffer[: len(getattr(self, name))] = getattr(self, name)
+                self._buffers[name] = buffer
+            setattr(self, name, self._buffers[name][:n])
+        return grown
+
+    def _rebind(self) -> None:
+        """Attaches every object to its row of the buffers."""
+        for i, object in enumerate(self.objects):
+            self._attach(object, i)
+
+    def _attach(self, object: "Matter", i: int) -> None:
+        """Copies the state of an object into row i and binds it to that row."""
+        self.positions[i] = object.position._a
+        self.velocities[i] = object.velocity._a
+        self.debt[i] = sum((force._a for force in object.debt), np.zeros(3))
+        self.radii[i] = object.radius
+        self.masses[i] = object.mass
+        self.colors[i] = object.color
+        self.active[i] = True
+        object.debt.clear()
+        object._position = Position.from_array(self.positions[i])
+        object._velocity = Velocity.from_array(self.velocities[i])
+        object.universe = self
+        object.index = i
+
+    def _detach(self, object: "Matter") -> None:
+        """Copies the state of an object out of its row and unbinds it."""
+        i = object.index
+        object._position = Position(array=np.array(self.positions[i], np.float64))
+        object._velocity = Velocity(array=np.array(self.velocities[i], np.float64))
+        if self.debt[i].any():
+            object.debt.append(Force(array=np.array(self.debt[i], np.float64)))
+        object.universe = None
+        object.index = None
+
+    def reorder(self) -> None:
+        """
+        Sorts the objects and their rows along the Morton curve of the grid.
+
+        Objects that are close in space then sit close in the buffers, so
+        the grid walks of collision detection touch memory mostly in order.
+        Objects are rebound to their new rows, and `objects` is reordered in
+        place to match. `sync_arrays` must be called first.
+        """
+        perm = self.spatial_hash.morton_order(self.positions, self.radii)
+        if np.array_equal(perm, np.arange(len(perm))):
+            return
+
+        for name in self._FIELDS:
+            buffer = getattr(self, name)
+            buffer[...] = buffer[perm]
+        self.objects[:] = [self.objects[k] for k in perm]
+        self._attached = list(self.objects)
+        for i, object in enumerate(self.objects):
+            object._position = Position.from_array(self.positions[i])
+            object._velocity = Velocity.from_array(self.velocities[i])
+            object.index = i
+        self.spatial_hash.permute(perm)
+
+    def broadphase_pairs(self) -> np.ndarray:
+        """
+        Returns the index pairs of objects whose radii overlap.
+
+        Uses the structure-of-arrays buffers, so `sync_arrays` must be called
+        first. The squared distances of all pairs come from the Gram matrix
+        |p_i|^2 + |p_j|^2 - 2 p_i . p_j, so the heavy lifting is a single
+        BLAS matrix product rather than an (N, N, 3) array of differences.
+
+        Returns
+        -------
+        np.ndarray
+            An (M, 2) array of object indices with i < j for every row.
+        """
+        # Centering and float64 keep the cancellation in the Gram form small
+        p = self.positions.astype(np.float64)
+        if len(p):
+            p -= p.mean(axis=0)
+        sq = np.einsum("ij,ij->i", p, p)
+        d2 = p @ p.T
+        d2 *= -2
+        d2 += sq[:, None]
+        d2 += sq[None, :]
+
+        r = self.radii[:, None] + self.radii[None, :]
+        hits = np.triu(d2 < r * r, k=1)
+        return np.stack(np.nonzero(hits), axis=1)
+
+    def _overlaps(self, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """
+        Returns a mask of the index pairs (i, j) whose radii overlap.
+
+        Squared distances are compared against squared radius sums, so no
+        square root is taken.
+        """
+        d = self.positions[i] - self.positions[j]
+        d2 = np.einsum("ij,ij->i", d, d)
+        r = self.radii[i] + self.radii[j]
+        return d2 < r * r
 
     def description(self, short: bool = True) -> str:
         if short:
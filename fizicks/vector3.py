@@ -0,0 +1,73 @@
+"""
+A lightweight 3-vector for code that handles many small, short-lived vectors.
+
+`Vector` wraps a NumPy array so it can view rows of a universe's buffers,
+which makes every single operation pay NumPy's per-call overhead.
+`Vector3` holds three plain floats instead. When the `fizicks._vector`
+extension has been built with Cython, its C implementation is used;
+otherwise the pure-Python class below is.
+"""
+
+from math import sqrt
+from typing import Iterator
+
+__all__ = ["Vector3"]
+
+
+class Vector3:
+    """
+    A vector in three-dimensional space stored as three floats.
+
+    Methods
+    -------
+    magnitude() -> float
+        Returns the magnitude of the vector.
+    dot(other: "Vector3") -> float
+        Returns the dot product of two vectors.
+    """
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def __add__(self, other: "Vector3") -> "Vector3":
+        return Vector3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other: "Vector3") -> "Vector3":
+        return Vector3(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, other: float) -> "Vector3":
+        return Vector3(self.x * other, self.y * other, self.z * other)
+
+    def __truediv__(self, other: float) -> "Vector3":
+        inv = 1.0 / other
+        return Vector3(self.x * inv, self.y * inv, self.z * inv)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Vector3):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y and self.z == other.z
+
+    def __iter__(self) -> Iterator[float]:
+        return iter((self.x, self.y, self.z))
+
+    def __repr__(self) -> str:
+        return f"Vector3({self.x}, {self.y}, {self.z})"
+
+    def magnitude(self) -> float:
+        """Returns the magnitude of the vector."""
+        return sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def dot(self, other: "Vector3") -> float:
+        """Returns the dot product of two vectors."""
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+
+try:
+    # Prefer the C implementation, which skips the interpreter for arithmetic
+    from fizicks._vector import Vector3  # type: ignore[no-redef]  # noqa: F811
+except ImportError:
+    pass
@@ -1,8 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, List
 
+import numpy as np
 import pygame
 
-from fizicks.collision import Collision
+from fizicks._kernels import NUMBA_AVAILABLE, draw_circles
+from fizicks.main import Fizicks
 
 
 class VisualDebugger:
@@ -17,11 +20,31 @@ class VisualDebugger:
         The universe to visualize.
     objects: List[Matter]
         The objects to visualize.
+    steps_per_second: float
+        The number of time steps simulated per second of real time,
+        independently of the frame rate.
     """
 
-    def __init__(self, universe: "Universe", objects: List["Matter"]):
+    # Frames drawn per second at most
+    FPS = 60
+    # Time steps run per frame at most, so that a slow frame does not make
+    # the next one slower still; time beyond that is dropped
+    MAX_STEPS_PER_FRAME = 8
+
+    def __init__(
+        self,
+        universe: "Universe",
+        objects: List["Matter"],
+        steps_per_second: float = 60.0,
+    ):
         self.universe = universe
         self.objects = objects
+        self.universe.objects = objects
+        # Bind the objects to the buffers, which the first frame is drawn from
+        self.universe.sync_arrays()
+        self.step_time = 1.0 / steps_per_second
+        # Real time, in seconds, not yet simulated
+        self.accumulator = 0.0
 
         # Pygame initialization
         pygame.init()
@@ -30,6 +53,40 @@ class VisualDebugger:
         )
         pygame.display.set_caption("Fizicks Visual Debugger")
         self.clock = pygame.time.Clock()
+        # Frame buffer the objects are drawn into, indexed like surfarray
+        self.frame = np.zeros((*self.screen.get_size(), 3), dtype=np.uint8)
+        # Pixel centers and radii of the objects, refilled every frame
+        self._centers = np.empty((0, 2), dtype=np.int64)
+        self._radii = np.empty(0, dtype=np.int64)
+
+    def advance(self, elapsed: float) -> int:
+        """
+        Advances the universe by the time steps due after some real time.
+
+        The elapsed time is added to an accumulator, and a time step is run
+        for every whole `step_time` in it, so the simulation runs at the
+        same rate however fast frames are drawn. The grid of the spatial
+        hash is kept across the steps of a frame as long as no object
+        changes cells.
+
+        Parameters
+        ----------
+        elapsed: float
+            The real time, in seconds, since the last call.
+
+        Returns
+        -------
+        int
+            The number of time steps run.
+        """
+        self.accumulator += elapsed
+        steps = min(int(self.accumulator / self.step_time), self.MAX_STEPS_PER_FRAME)
+        for _ in range(steps):
+            Fizicks.step(self.universe)
+        self.accumulator -= steps * self.step_time
+        # Drop the time that could not be caught up on
+        self.accumulator = min(self.accumulator, self.step_time)
+        return steps
 
     def draw_object(self, obj: "Matter") -> None:
         """
@@ -47,6 +104,37 @@ class VisualDebugger:
             int(obj.radius),
         )
 
+    def draw_objects(self) -> None:
+        """
+        Draws every object in the universe on the screen.
+
+        Reads the universe's structure-of-arrays buffers in one pass rather
+        than going through the properties of each object, casting them to
+        pixels into buffers that are reused across frames. With Numba, the
+        circles are drawn into a frame buffer by a compiled kernel and the
+        buffer is copied to the screen in one call, replacing the screen's
+        contents; otherwise each circle is drawn with Pygame.
+        """
+        universe = self.universe
+        n = len(universe.radii)
+        if len(self._radii) != n:
+            self._centers = np.empty((n, 2), dtype=np.int64)
+            self._radii = np.empty(n, dtype=np.int64)
+        # Truncates like int(), without a temporary array
+        centers, radii = self._centers, self._radii
+        np.copyto(centers, universe.positions[:, :2], casting="unsafe")
+        np.copyto(radii, universe.radii, casting="unsafe")
+        if NUMBA_AVAILABLE:
+            self.frame.fill(0)
+            draw_circles(self.frame, centers, radii, universe.colors)
+            pygame.surfarray.blit_array(self.screen, self.frame)
+            return
+
+        for center, radius, color in zip(
+            centers.tolist(), radii.tolist(), universe.colors.tolist()
+        ):
+            pygame.draw.circle(self.screen, color, center, radius)
+
     def draw_border(self) -> None:
         """
         Draws the border of the universe on the screen.
@@ -63,30 +151,32 @@ class VisualDebugger:
     def run(self) -> None:
         """
         Runs the simulation and visualizes the universe and objects.
+
+        Frames are drawn at up to `FPS` per second, and between them the
+        universe is advanced by the time steps due, see `advance`. Once a
+        frame's objects are drawn, the steps run on a worker thread while
+        the main thread shows the frame and waits out the frame rate cap;
+        Pygame itself is only called from the main thread. The Numba
+        kernels of a step release the GIL, so they overlap with the frame.
         """
+        elapsed = 0.0
         running = True
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-
-            self.screen.fill((0, 0, 0))  # Clear screen with black
-
-            self.draw_border()
-
-            # Identify collisions
-            for i, obj in enumerate(self.objects):
-                for other_obj in self.objects[i + 1 :]:
-                    if obj.collides_with(other_obj):
-                        Collision.resolve(obj, other_obj)
-
-            for obj in self.objects:
-                obj.update(self.universe)
-                self.draw_object(obj)
-
-            self.universe.time += 1
-
-            pygame.display.flip()
-            self.clock.tick(60)  # Cap the frame rate at 60 FPS
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            while running:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+
+                self.screen.fill((0, 0, 0))  # Clear screen with black
+
+                self.draw_objects()
+                # The objects are drawn, so the universe can move on
+                steps = pool.submit(self.advance, elapsed)
+                self.draw_border()
+
+                pygame.display.flip()
+                # Cap the frame rate; the time it took is simulated next frame
+                elapsed = self.clock.tick(self.FPS) / 1000
+                steps.result()
 
         pygame.quit()
@@ -1,5 +1,43 @@
 # setup.py
-from setuptools import setup, find_packages
+import os
+import sys
+
+from setuptools import Extension, setup, find_packages
+
+# Compile the collision math and Vector3 ahead of time when Cython is available
+ext_modules = []
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
+if cythonize is not None:
+    extra_compile_args = [] if sys.platform == "win32" else ["-O3", "-ffast-math"]
+    ext_modules += cythonize(
+        [
+            Extension(
+                "fizicks._physics",
+                ["fizicks/_physics.pyx"],
+                extra_compile_args=extra_compile_args,
+            ),
+            Extension(
+                "fizicks._collision",
+                ["fizicks/_collision.pyx"],
+                extra_compile_args=extra_compile_args,
+            ),
+            Extension(
+                "fizicks._vector",
+                ["fizicks/_vector.pyx"],
+                extra_compile_args=extra_compile_args,
+            ),
+        ]
+    )
+
+# Set FIZICKS_MYPYC=1 to compile the Vector types into a C extension with mypyc
+if os.environ.get("FIZICKS_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules += mypycify(["--follow-imports=silent", "fizicks/data.py"])
 
 setup(
     name="fizicks",
@@ -11,7 +49,9 @@ setup(
     long_description_content_type="text/markdown",
     url="https://pypi.org/project/fizicks/",
     packages=find_packages(),
-    install_requires=[],
+    ext_modules=ext_modules,
+    install_requires=["numpy"],
+    extras_require={"jit": ["numba"], "simd": ["simsimd"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -1,6 +1,9 @@
 import unittest
 
-from fizicks.collision import Collision
+import numpy as np
+
+from fizicks._kernels import resolve_elastic_batch, resolve_elastic_colored
+from fizicks.collision import Collision, _color_pairs
 from fizicks.data import Position, Vector
 from fizicks.matter import Matter
 from fizicks.universe import Universe
@@ -9,8 +12,8 @@ from fizicks.universe import Universe
 class TestCollision(unittest.TestCase):
     def setUp(self):
         self.universe = Universe(toroidal=True)
-        self.object1 = Matter(Vector(10, 10), Vector(1, 0), 5, 10)
-        self.object2 = Matter(Vector(20, 10), Vector(-1, 0), 5, 10)
+        self.object1 = Matter(Vector(10, 10, 10), Vector(1, 0), 5, 10)
+        self.object2 = Matter(Vector(20, 10, 10), Vector(-1, 0), 5, 10)
 
     def test_detect_objects_collision(self):
         self.assertTrue(Collision.detect(self.object1, self.object2))
@@ -19,6 +22,15 @@ class TestCollision(unittest.TestCase):
         self.object2.position = Position(50, 50, 0)
         self.assertFalse(Collision.detect(self.object1, self.object2))
 
+    def test_detect_objects_touching(self):
+        # Objects that only touch do not collide, whichever check is used
+        self.object2.position = Position(30, 10, 10)
+        self.assertFalse(Collision.detect(self.object1, self.object2))
+        self.assertFalse(self.object1.collides_with(self.object2))
+        self.object2.position = Position(29, 10, 10)
+        self.assertTrue(Collision.detect(self.object1, self.object2))
+        self.assertTrue(self.object1.collides_with(self.object2))
+
     def test_detect_border_collision(self):
         self.universe.toroidal = False
         self.object1.position = Position(-1, 10, 0)
@@ -27,6 +39,11 @@ class TestCollision(unittest.TestCase):
     def test_detect_no_border_collision(self):
         self.assertFalse(Collision.detect(self.object1, self.universe))
 
+    def test_detect_no_border_collision_unbounded_axis(self):
+        universe = Universe(dimensions=Vector(100, 100))
+        self.object1.position = Position(50, 50, 0)
+        self.assertFalse(Collision.detect(self.object1, universe))
+
     def test_resolve_objects_collision(self):
         initial_v1 = self.object1.velocity.copy()
         initial_v2 = self.object2.velocity.copy()
@@ -37,6 +54,60 @@ class TestCollision(unittest.TestCase):
         self.assertNotEqual(initial_v1, self.object1.velocity)
         self.assertNotEqual(initial_v2, self.object2.velocity)
 
+    def test_resolve_objects_keeps_tangential_z(self):
+        self.object1.velocity = Vector(1, 0, 2)
+        Collision._resolve_objects(self.object1, self.object2)
+        self.assertEqual(self.object1.velocity, Vector(-1, 0, 2))
+        self.assertEqual(self.object2.velocity, Vector(1, 0, 0))
+
+    def test_resolve_batch(self):
+        self.universe.objects = [self.object1, self.object2]
+        self.universe.sync_arrays()
+        Collision.resolve_batch(self.universe, Collision.detect_pairs(self.universe))
+        self.assertEqual(self.object1.velocity, Vector(-1, 0, 0))
+        self.assertEqual(self.object2.velocity, Vector(1, 0, 0))
+        self.assertEqual(self.universe.debt[0].tolist(), [-10, 0, 0])
+
+    def test_detect_pairs_dedups_candidates(self):
+        self.universe.objects = [self.object1, self.object2]
+        self.universe.sync_arrays()
+        candidates = [(1, 0), (0, 1), (0, 1), (1, 1)]
+        pairs = Collision.detect_pairs(self.universe, candidates)
+        self.assertEqual(pairs, [(0, 1)])
+
+    def test_resolve_colored_matches_batch(self):
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(0, 50, (400, 3))
+        velocities = rng.uniform(-1, 1, (400, 3))
+        masses = rng.uniform(1, 5, 400)
+        radii = np.full(400, 2.0)
+        i, j = np.triu_indices(400, 1)
+        close = np.linalg.norm(positions[i] - positions[j], axis=1) < 4
+        pairs = np.stack((i[close], j[close]), axis=1).astype(np.int32)
+
+        groups = _color_pairs(pairs, positions, radii)
+        self.assertIsNotNone(groups)
+        sorted_pairs, group_start, color_start = groups
+        for c in range(27):
+            first, last = group_start[color_start[c]], group_start[color_start[c + 1]]
+            for g in range(color_start[c], color_start[c + 1]):
+                members = sorted_pairs[group_start[g] : group_start[g + 1]]
+                rest = np.concatenate(
+                    (
+                        sorted_pairs[first : group_start[g]],
+                        sorted_pairs[group_start[g + 1] : last],
+                    )
+                )
+                self.assertFalse(np.isin(members, rest).any())
+
+        expected = np.zeros((400, 3))
+        resolve_elastic_batch(
+            pairs, positions, velocities, masses, expected, np.empty((len(pairs), 2, 3))
+        )
+        out_dv = np.zeros((400, 3))
+        resolve_elastic_colored(*groups, positions, velocities, masses, out_dv)
+        np.testing.assert_allclose(out_dv, expected, atol=1e-9)
+
     def test_resolve_border_collision_toroidal(self):
         self.object1.position = Position(-1, 10, 0)
         Collision.resolve(self.object1, self.universe)
@@ -45,10 +116,10 @@ class TestCollision(unittest.TestCase):
 
     def test_resolve_border_collision_non_toroidal(self):
         self.universe.toroidal = False
-        self.object1.position = Position(101, 10, 0)
+        self.object1.position = Position(101, 10, 10)
         Collision.resolve(self.object1, self.universe)
         self.object1.update(self.universe)
-        self.assertEqual(self.object1.position, Position(89, 10, 0))
+        self.assertEqual(self.object1.position, Position(89, 10, 10))
 
     def test_detect_objects_private(self):
         self.assertTrue(Collision._detect_objects(self.object1, self.object2))
@@ -61,7 +132,7 @@ class TestCollision(unittest.TestCase):
     def test_resolve_border_private(self):
         self.object1.position = Position(101, 10, 0)
         Collision._resolve_border(self.object1, self.universe)
-        self.assertEqual(self.object1.position, Position(0, 10, 0))
+        self.assertEqual(self.object1.position, Position(1, 10, 0))
 
 
 if __name__ == "__main__":
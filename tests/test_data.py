@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from fizicks.data import Force, Position, Vector, Velocity
+from fizicks.vector3 import Vector3
+
+
+class TestVector:
+    def test_no_instance_dict(self):
+        for cls in (Vector, Force, Position, Velocity):
+            assert not hasattr(cls(1, 2, 3), "__dict__")
+
+    def test_arithmetic_keeps_type(self):
+        v = Velocity(1, 2, 3) + Velocity(1, 1, 1)
+        assert type(v) is Velocity
+        assert v == Velocity(2, 3, 4)
+        assert Position(3, 3, 3) / 2 == Position(1.5, 1.5, 1.5)
+
+    def test_array(self):
+        v = Vector(1, 2, 3)
+        assert np.asarray(v) is v._a
+        assert np.array(v, dtype=np.float32).tolist() == [1, 2, 3]
+
+        copied = np.array(v, copy=True)
+        assert copied is not v._a
+        assert copied.tolist() == [1, 2, 3]
+        assert np.asarray(v, copy=False) is v._a
+        with pytest.raises(ValueError):
+            np.asarray(v, dtype=np.float32, copy=False)
+
+    def test_in_place_arithmetic(self):
+        v = Velocity(1, 2, 3)
+        backing = v._a
+        v += Velocity(1, 1, 1)
+        v -= Velocity(0, 1, 0)
+        v *= 2
+        assert v._a is backing
+        assert v == Velocity(4, 4, 8)
+
+
+class TestVector3:
+    def test_arithmetic(self):
+        a = Vector3(1, 2, 3)
+        b = Vector3(1, 1, 1)
+        assert a + b == Vector3(2, 3, 4)
+        assert a - b == Vector3(0, 1, 2)
+        assert a * 2 == Vector3(2, 4, 6)
+        assert a / 2 == Vector3(0.5, 1, 1.5)
+        assert tuple(a) == (1, 2, 3)
+
+    def test_division_by_zero(self):
+        # Holds for the compiled class as well as the pure-Python one
+        with pytest.raises(ZeroDivisionError):
+            Vector3(1, 2, 3) / 0
+
+    def test_magnitude_and_dot(self):
+        assert Vector3(3, 4, 0).magnitude() == 5
+        assert Vector3(1, 2, 3).dot(Vector3(4, 5, 6)) == 32
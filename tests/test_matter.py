@@ -14,6 +14,10 @@ class TestMatter:
         assert matter.radius == 1
         assert matter.debt == []
 
+    def test_matter_ids_are_unique(self):
+        ids = {Matter(Position(0, 0, 0), Velocity(0, 0, 0), 1, 1).id for _ in range(10)}
+        assert len(ids) == 10
+
     def test_matter_apply_force(self):
         matter = Matter(Position(0, 0, 0), Velocity(0, 0, 0), 1, 1)
         force = Force(1, 2, 3)
@@ -28,7 +32,7 @@ class TestMatter:
         assert matter.velocity == Velocity(3, 3, 2)
 
         # Check the position
-        assert matter.position == Position(5, 6, 5)
+        assert matter.position == Position(5, 6, 6)
 
         # Check that mass and radius remain unchanged
         assert matter.mass == 1
@@ -44,11 +48,21 @@ class TestMatter:
     def test_matter_update(self):
         matter = Matter(Position(0, 0, 0), Velocity(0, 0, 0), 1, 1)
         matter.update(Universe())
-        assert matter.position == Position(1, 1, 0)
+        assert matter.position == Position(1, 1, 1)
 
     def test_matter_update_with_debt(self):
         matter = Matter(Position(0, 0, 0), Velocity(0, 0, 0), 1, 1)
         force = Force(1, 1, 1)
         matter.add_debt(force)
         matter.update(Universe())
-        assert matter.position == Position(2, 2, 1)
+        assert matter.position == Position(2, 2, 2)
+
+    def test_matter_assignment_copies_vectors(self):
+        x = Matter(Position(10, 10, 10), Velocity(1, 0, 0), 1, 1)
+        y = Matter(Position(50, 50, 50), Velocity(0, 0, 0), 1, 1)
+        y.position = x.position
+        y.velocity = x.velocity
+        assert y.position is not x.position
+        x.update(Universe())
+        assert x.position == Position(11, 10, 10)
+        assert y.position == Position(10, 10, 10)
@@ -22,7 +22,12 @@ class TestMotion:
         obj = Matter(Position(0, 0, 0), Velocity(0, 1, 1), 2.0, 1.0)
         ThirdLaw.apply(obj)
         obj.update(Universe())
-        assert obj.acceleration == Velocity(0, 0, 0)
+        assert obj.acceleration == Velocity(0, 0.5, 0.5)
+
+    def test_third_law_keeps_fractions(self):
+        obj = Matter(Position(0, 0, 0), Velocity(3, 1, -1), 4.0, 1.0)
+        ThirdLaw.apply(obj)
+        assert obj.acceleration == Velocity(0.75, 0.25, -0.25)
 
     def test_motion_update(self):
         obj = Matter(Velocity(0, 0, 0), Position(0, 0, 0), 1.0, 1.0)
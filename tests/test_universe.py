@@ -0,0 +1,429 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from fizicks import _cuda, _kernels
+from fizicks._kernels import (
+    GRID_CHUNKS,
+    draw_circles,
+    find_grid_pairs,
+    grid_pairs,
+    integrate_numpy,
+    specialize_integrate,
+)
+from fizicks.broadphase import Broadphase
+from fizicks.collision import Collision
+from fizicks.data import Force, Position, SpatialHash, Vector, Velocity
+from fizicks.matter import Matter
+from fizicks.motion import Motion
+from fizicks.universe import DTYPE, Universe
+
+
+class TestUniverse:
+    def setup_method(self):
+        self.universe = Universe(dimensions=Vector(100, 100, 100))
+        self.universe.objects = [
+            Matter(Position(10, 10, 10), Velocity(1, 0, 0), 1, 5),
+            Matter(Position(18, 10, 10), Velocity(-1, 0, 0), 1, 5),
+            Matter(Position(50, 50, 50), Velocity(0, 0, 0), 1, 5),
+        ]
+
+    def test_sync_arrays(self):
+        self.universe.sync_arrays()
+        assert self.universe.positions.shape == (3, 3)
+        assert np.array_equal(self.universe.positions[1], [18, 10, 10])
+        assert np.array_equal(self.universe.velocities[0], [1, 0, 0])
+        assert np.array_equal(self.universe.radii, [5, 5, 5])
+
+    def test_sync_arrays_detaches_removed_objects(self):
+        self.universe.sync_arrays()
+        a, b = self.universe.objects[:2]
+        a_position = a.position._a.copy()
+        b_position = b.position._a.copy()
+        self.universe.debt[0] = [1, 0, 0]
+        self.universe.objects.remove(a)
+        self.universe.sync_arrays()
+        assert a.universe is None and a.index is None
+        assert np.array_equal(a.position._a, a_position)
+        assert not np.shares_memory(a.position._a, self.universe.positions)
+        assert a.debt == [Force(1, 0, 0)]
+        assert np.array_equal(self.universe.positions[0], b_position)
+
+        a.add_debt(Force(0, 1, 0))
+        assert not self.universe.debt[0].any()
+        a.position = Position(0, 0, 0)
+        assert np.array_equal(self.universe.positions[0], b_position)
+
+    def test_add_object_detaches_removed_objects(self):
+        self.universe.sync_arrays()
+        a = self.universe.objects.pop()
+        self.universe.add_object(Matter(Position(1, 1, 1), Velocity(0, 0, 0), 1, 1))
+        assert a.universe is None
+        assert a.position == Position(50, 50, 50)
+        assert self.universe.positions[2].tolist() == [1, 1, 1]
+
+    def test_dimensions(self):
+        universe = Universe(dimensions=(50, 60, 0))
+        assert universe.dimensions == Vector(50, 60, 0)
+        assert universe.dimensions_arr.dtype == DTYPE
+        assert universe.dimensions_arr is universe.dimensions._a
+
+    def test_dtype_from_environment(self):
+        code = (
+            "from fizicks.universe import Universe; print(Universe().positions.dtype)"
+        )
+        env = dict(os.environ, FIZICKS_DTYPE="float64")
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+        )
+        assert result.stdout.strip() == "float64"
+
+        env["FIZICKS_DTYPE"] = "foo"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+        )
+        assert "ValueError: FIZICKS_DTYPE must be float32 or float64" in result.stderr
+
+    def test_add_object(self):
+        universe = Universe()
+        for object in self.universe.objects:
+            universe.add_object(object)
+        object = universe.objects[1]
+        assert object.index == 1
+        assert np.array_equal(universe.positions[1], [18, 10, 10])
+        object.position = Position(20, 20, 20)
+        object.mass = 3
+        object.color = (255, 0, 0)
+        assert np.array_equal(universe.positions[1], [20, 20, 20])
+        assert universe.masses[1] == 3
+        assert universe.colors[1].tolist() == [255, 0, 0]
+        universe.velocities[1] = [0, 0, 2]
+        assert object.velocity == Velocity(0, 0, 2)
+
+    def test_broadphase_pairs(self):
+        self.universe.sync_arrays()
+        pairs = self.universe.broadphase_pairs()
+        assert pairs.tolist() == [[0, 1]]
+
+    def test_step(self):
+        Motion.step(self.universe)
+        assert self.universe.time == 1
+        assert self.universe.objects[0].velocity.x < 0
+        assert self.universe.objects[1].velocity.x > 0
+        assert np.array_equal(self.universe.positions[2], [50, 50, 50])
+        assert self.universe.objects[2].time == 1
+
+    def test_step_sleeps_resting_objects(self):
+        Motion.step(self.universe)
+        assert self.universe.active.tolist() == [True, True, False]
+        self.universe.objects[2].add_debt(Force(1, 0, 0))
+        assert self.universe.active[2]
+        Motion.step(self.universe)
+        assert self.universe.objects[2].position == Position(51, 50, 50)
+
+    def test_step_wakes_objects_on_component_writes(self):
+        Motion.step(self.universe)
+        assert not self.universe.active[2]
+        self.universe.objects[2].velocity.x = 2.0
+        Motion.step(self.universe)
+        assert self.universe.objects[2].position == Position(52, 50, 50)
+        assert self.universe.active[2]
+
+    @pytest.mark.parametrize("toroidal", [False, True])
+    def test_step_matches_update(self, toroidal):
+        rng = np.random.default_rng(0)
+        universes = [Universe(toroidal=toroidal) for _ in range(2)]
+        for p, v in zip(rng.uniform(0, 100, (50, 3)), rng.uniform(-5, 5, (50, 3))):
+            for universe in universes:
+                universe.add_object(Matter(Position(*p), Velocity(*v), 2, 1))
+        universes[0].objects[0].add_debt(Force(1, 2, 3))
+        universes[1].objects[0].add_debt(Force(1, 2, 3))
+
+        Motion.step(universes[0])
+        for object in universes[1].objects:
+            object.update(universes[1])
+        assert np.allclose(universes[0].positions, universes[1].positions)
+        assert np.allclose(universes[0].velocities, universes[1].velocities)
+
+    def test_reorder(self):
+        rng = np.random.default_rng(0)
+        universe = Universe()
+        for p in rng.uniform(0, 100, (200, 3)):
+            universe.add_object(Matter(Position(*p), Velocity(0, 0, 0), 1, 2))
+        objects = list(universe.objects)
+        positions = {o.id: o.position._a.copy() for o in objects}
+        pairs = {
+            frozenset((objects[i].id, objects[j].id))
+            for i, j in universe.spatial_hash.query_pairs(universe)
+        }
+
+        universe.reorder()
+        assert universe.objects != objects
+        for i, object in enumerate(universe.objects):
+            assert object.index == i
+            assert np.array_equal(universe.positions[i], positions[object.id])
+            # Still a view into its row
+            object.position.x += 1
+            assert universe.positions[i, 0] == positions[object.id][0] + 1
+            object.position.x -= 1
+
+        objects = universe.objects
+        assert pairs == {
+            frozenset((objects[i].id, objects[j].id))
+            for i, j in universe.spatial_hash.query_pairs(universe)
+        }
+
+    @pytest.mark.parametrize("toroidal", [False, True])
+    def test_integrate_numpy(self, toroidal):
+        rng = np.random.default_rng(0)
+        n = 100
+        dims = np.array([100, 100, 0], dtype=np.float32)
+        radii = np.full(n, 2, dtype=np.float32)
+        state = [rng.uniform(-10, 110, (n, 3)).astype(np.float32) for _ in range(3)]
+
+        # Objects at rest are inside the universe and owe no force
+        active = rng.random(n) < 0.5
+        state[0][~active] = 50
+        state[1][~active] = 0
+        state[2][~active] = 0
+        a = [x.copy() for x in state]
+        b = [x.copy() for x in state]
+        active = [active, active.copy()]
+
+        kernel = specialize_integrate(tuple(dims.tolist()), toroidal)
+        kernel(a[0], a[1], a[2], radii, active[0], 1.0)
+        integrate_numpy(b[0], b[1], b[2], radii, active[1], dims, toroidal, block=16)
+        for x, y in zip(a, b):
+            assert np.allclose(x, y, atol=1e-4)
+        assert np.array_equal(active[0], active[1])
+
+    @pytest.mark.parametrize("toroidal", [False, True])
+    def test_specialize_integrate(self, toroidal):
+        rng = np.random.default_rng(0)
+        n = 100
+        dims = np.array([100, 100, 0], dtype=DTYPE)
+        radii = np.full(n, 2, dtype=DTYPE)
+        state = [rng.uniform(-10, 110, (n, 3)).astype(DTYPE) for _ in range(3)]
+        a = [x.copy() for x in state]
+        b = [x.copy() for x in state]
+        active = [np.ones(n, dtype=np.bool_) for _ in range(2)]
+
+        kernel = specialize_integrate(tuple(dims.tolist()), toroidal)
+        kernel(a[0], a[1], a[2], radii, active[0], 0.5)
+        integrate_numpy(b[0], b[1], b[2], radii, active[1], dims, toroidal, 0.5)
+        for x, y in zip(a, b):
+            assert np.allclose(x, y, atol=1e-4)
+        assert np.array_equal(active[0], active[1])
+
+        # The restitution is an argument, so one kernel serves every value
+        assert specialize_integrate(tuple(dims.tolist()), toroidal) is kernel
+
+    def test_grid_pairs(self):
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(0, 50, (300, 3)).astype(DTYPE)
+        radii = np.full(300, 2, dtype=DTYPE)
+        active = rng.random(300) < 0.5
+        spatial_hash = SpatialHash()
+        spatial_hash.build(positions, radii)
+        grid = (spatial_hash.keys, spatial_hash.order, spatial_hash.cell_start)
+
+        # Every overlapping pair with at least one active object
+        distance = np.linalg.norm(positions[:, None] - positions[None], axis=-1)
+        overlap = np.triu(distance < 4, k=1) & (active[:, None] | active[None])
+        expected = sorted(map(tuple, np.argwhere(overlap).tolist()))
+
+        # A buffer too small for the pairs is grown
+        out = np.empty((GRID_CHUNKS, 2), dtype=np.int32)
+        counts = np.empty(GRID_CHUNKS, dtype=np.int64)
+        count, out = find_grid_pairs(
+            *grid, tuple(SpatialHash.NEIGHBORS), positions, radii, active, out, counts
+        )
+        assert sorted(map(tuple, out[:count].tolist())) == expected
+
+        pairs = grid_pairs(
+            *grid, SpatialHash.NEIGHBOR_OFFSETS, positions, radii, active
+        )
+        assert sorted(map(tuple, pairs.tolist())) == expected
+
+    @pytest.mark.skipif(not _kernels.NUMBA_AVAILABLE, reason="Numba is not installed")
+    def test_load_source_cache(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        source = "def value():\n    return 1\n"
+        namespace, cached = _kernels._load_source(source)
+        assert cached and namespace["value"]() == 1
+        (path,) = (tmp_path / "fizicks").glob("_fizicks_*.py")
+
+        # A corrupt module is written again before it is imported
+        path.write_text("def value(:\n")
+        namespace, cached = _kernels._load_source(source)
+        assert cached and namespace["value"]() == 1
+        assert path.read_text() == source
+
+        # A module that cannot be imported falls back to running in memory
+        def write_broken(directory, path, source):
+            with open(path, "w") as file:
+                file.write("(")
+
+        monkeypatch.setattr(_kernels, "_write_module", write_broken)
+        path.write_text("")
+        namespace, cached = _kernels._load_source(source)
+        assert not cached and namespace["value"]() == 1
+        monkeypatch.undo()
+
+        # Only the newest modules are kept
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        monkeypatch.setattr(_kernels, "CACHE_SIZE", 2)
+        for k in range(4):
+            _kernels._load_source(f"def value():\n    return {k}\n")
+        assert len(list((tmp_path / "fizicks").glob("_fizicks_*.py"))) == 2
+
+    def test_draw_circles(self):
+        frame = np.zeros((20, 10, 3), dtype=np.uint8)
+        centers = np.array([[5, 5], [19, 0]])
+        colors = np.array([[255, 0, 0], [0, 0, 255]], dtype=np.uint8)
+        draw_circles(frame, centers, np.array([2, 3]), colors)
+        assert frame[5, 5].tolist() == [255, 0, 0]
+        assert frame[7, 5].tolist() == [255, 0, 0]
+        assert frame[7, 7].tolist() == [0, 0, 0]
+        assert frame[19, 3].tolist() == [0, 0, 255]
+        assert (frame[..., 0] > 0).sum() == 13
+
+    def test_spatial_hash_pairs(self):
+        self.universe.sync_arrays()
+        pairs = set(self.universe.spatial_hash.query_pairs(self.universe))
+        assert (0, 1) in pairs
+        assert (0, 2) not in pairs
+        assert (1, 2) not in pairs
+
+    def test_spatial_hash_far_objects(self):
+        universe = Universe(dimensions=Vector(0, 0, 0))
+        for x in (-1e9, -1e9 + 1, 0, 1e9):
+            universe.add_object(Matter(Position(x, 0, 0), Velocity(0, 0, 0), 1, 1))
+        pairs = set(universe.spatial_hash.query_pairs(universe))
+        assert (0, 1) in pairs
+        assert (0, 2) not in pairs
+
+    def test_spatial_hash_colliding_pairs(self):
+        rng = np.random.default_rng(0)
+        universe = Universe()
+        for p in rng.uniform(0, 100, (500, 3)):
+            universe.add_object(
+                Matter(Position(*p), Velocity(0, 0, 0), 1, rng.uniform(1, 4))
+            )
+        universe.active[::2] = False
+        spatial_hash = universe.spatial_hash
+        expected = np.array(list(spatial_hash.query_pairs(universe)))
+        expected = expected[universe._overlaps(expected[:, 0], expected[:, 1])]
+        pairs = spatial_hash.colliding_pairs(universe)
+        assert sorted(map(tuple, pairs.tolist())) == sorted(
+            map(tuple, expected.tolist())
+        )
+        active = spatial_hash.colliding_pairs(universe, active_only=True)
+        assert universe.active[active].any(axis=1).all()
+        assert 0 < len(active) < len(pairs)
+
+    def test_spatial_hash_grows_pair_buffer(self):
+        rng = np.random.default_rng(0)
+        universe = Universe()
+        for p in rng.uniform(0, 20, (300, 3)):
+            universe.add_object(Matter(Position(*p), Velocity(1, 0, 0), 1, 2))
+        spatial_hash = universe.spatial_hash
+        spatial_hash._pairs = spatial_hash._pairs[:GRID_CHUNKS]
+        pairs = spatial_hash.colliding_pairs(universe)
+        expected = np.array(list(spatial_hash.query_pairs(universe)))
+        expected = expected[universe._overlaps(expected[:, 0], expected[:, 1])]
+        assert sorted(map(tuple, pairs.tolist())) == sorted(
+            map(tuple, expected.tolist())
+        )
+
+    def test_spatial_hash_reuses_grid(self):
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(0, 100, (500, 3))
+        radii = np.full(500, 2.0)
+        spatial_hash = SpatialHash()
+        spatial_hash.build(positions, radii)
+        order = spatial_hash.order
+        spatial_hash.build(positions.copy(), radii)
+        assert spatial_hash.order is order
+
+        positions[:50] += rng.uniform(-5, 5, (50, 3))
+        spatial_hash.build(positions, radii)
+        fresh = SpatialHash()
+        fresh.build(positions, radii)
+        assert np.array_equal(spatial_hash.keys, fresh.keys)
+        assert np.array_equal(spatial_hash.cell_start, fresh.cell_start)
+        for c in range(len(fresh.keys)):
+            cell = slice(fresh.cell_start[c], fresh.cell_start[c + 1])
+            assert set(spatial_hash.order[cell]) == set(fresh.order[cell])
+
+    def test_spatial_hash_neighbor_cells(self):
+        spatial_hash = SpatialHash(cell_size=10)
+        positions = np.array([[5, 5, 5], [15, 5, 5], [5, 15, 15], [45, 5, 5]])
+        spatial_hash.build(positions, np.ones(4))
+        neighbors = spatial_hash.neighbor_cells()
+        assert neighbors.shape == (4, 13)
+        cell = {i: c for c in range(4) for i in spatial_hash.order[c : c + 1]}
+        found = set(neighbors[cell[0]][neighbors[cell[0]] >= 0].tolist())
+        assert found == {cell[1], cell[2]}
+        assert (neighbors[cell[3]] < 0).all()
+
+    def test_borders_batch(self):
+        self.universe.toroidal = True
+        self.universe.objects[2].position = Position(103, 50, 50)
+        self.universe.sync_arrays()
+        assert Collision.detect_borders_batch(self.universe).tolist() == [2]
+        Collision.resolve_borders_batch(self.universe)
+        assert self.universe.objects[2].position == Position(3, 50, 50)
+
+    def test_borders_batch_restitution(self):
+        self.universe.restitution = 0.5
+        self.universe.objects[0].position = Position(97, 10, 10)
+        self.universe.sync_arrays()
+        Collision.resolve_borders_batch(self.universe)
+        assert self.universe.objects[0].position == Position(95, 10, 10)
+        assert self.universe.objects[0].velocity == Velocity(-0.5, 0, 0)
+
+    def test_sweep_and_prune_pairs(self):
+        broadphase = Broadphase()
+        self.universe.sync_arrays()
+        assert broadphase.candidate_pairs(self.universe).tolist() == [[0, 1]]
+        self.universe.objects[2].position = Position(12, 12, 12)
+        self.universe.sync_arrays()
+        pairs = Collision.detect_pairs(
+            self.universe, broadphase.candidate_pairs(self.universe)
+        )
+        assert pairs == [(0, 1), (0, 2), (1, 2)]
+
+    @pytest.mark.skipif(not _cuda.available(), reason="CUDA is not available")
+    def test_cuda_candidate_pairs(self):
+        self.universe.sync_arrays()
+        pairs = Broadphase().candidate_pairs_cuda(self.universe).copy_to_host()
+        assert pairs.tolist() == [[0, 1]]
+
+    def test_run(self):
+        Motion.run(self.universe, 3)
+        assert self.universe.time == 3
+        assert self.universe.objects[0].time == 3
+
+    @pytest.mark.skipif(not _cuda.available(), reason="CUDA is not available")
+    def test_run_cuda(self):
+        reference = Universe(dimensions=Vector(100, 100, 100))
+        for object in self.universe.objects:
+            reference.add_object(
+                Matter(object.position, object.velocity, object.mass, object.radius)
+            )
+        Motion.run(self.universe, 3, use_cuda=True)
+        Motion.run(reference, 3)
+        assert np.allclose(self.universe.positions, reference.positions, atol=1e-4)
+        assert np.allclose(self.universe.velocities, reference.velocities, atol=1e-4)